@@ -1,12 +1,16 @@
 import re
 import asyncio
-import aiohttp
 import json
+import time
+from collections import OrderedDict, deque
 from datetime import datetime
-from urllib.parse import quote
+from typing import Dict, Optional
 from telethon import TelegramClient, events
+from telethon.errors import FloodWaitError
 from dotenv import load_dotenv
 import os
+from insight_store import open_insight_store
+from blockvision import BlockvisionClient, BlockvisionUnavailable
 
 # Load environment variables from .env file
 load_dotenv()
@@ -29,19 +33,44 @@ bot_api_key = os.getenv("BOT_API_KEY")
 if not bot_api_key:
     raise ValueError("❌ BOT_API_KEY is not set in the environment variables.")
 
-# Configuration constants
-INSIGHTS_FILE = "telegram_insights.json"
+# Shared insight store, also read by the API server
+insight_store = open_insight_store()
 
 # No longer restricting to specific source chats – listen to any chat
 target_channel_id = get_int_env("TARGET_CHANNEL_ID")
 
 # Regex pattern for detecting Sui contract addresses
 contract_regex = r"(0x[a-fA-F0-9]{64}::[a-zA-Z0-9_]+::[a-zA-Z0-9_]+)"
+contract_pattern = re.compile(contract_regex)
 
-# API configurations for Blockvision
-BLOCKVISION_API_URL = "https://api.blockvision.org/v2/sui/coin/detail"
-BLOCKVISION_HOLDERS_API_URL = "https://api.blockvision.org/v2/sui/coin/holders"
-BLOCKVISION_API_KEY = os.getenv("BLOCKVISION_API_KEY")
+# Shared pooled Blockvision client
+blockvision = BlockvisionClient(scope="tg")
+
+# Contract processing pool: the message handler only queues detected contracts,
+# workers enrich, persist and notify.
+worker_count = int(os.getenv("TG_WORKERS", "4"))
+queue_size = int(os.getenv("TG_QUEUE_SIZE", "100"))
+# What to drop when the queue is full: "drop_oldest" or "drop_newest"
+queue_policy = os.getenv("TG_QUEUE_POLICY", "drop_oldest")
+if queue_policy not in ("drop_oldest", "drop_newest"):
+    raise ValueError(f"❌ TG_QUEUE_POLICY must be drop_oldest or drop_newest, got {queue_policy!r}")
+
+# How long a detected contract waits for a RickBurpBot analysis, and how many may wait at once
+pending_ttl = float(os.getenv("TG_PENDING_TTL", "600"))
+pending_max_size = int(os.getenv("TG_PENDING_MAX_SIZE", "10000"))
+
+# Notifications to the target channel are batched over this many seconds
+notify_debounce = float(os.getenv("TG_NOTIFY_DEBOUNCE", "2"))
+# Also post each insight as a "Debug JSON" message
+send_debug_json = os.getenv("TG_DEBUG_JSON", "false").lower() in ("1", "true", "yes")
+# Telegram's message length limit, and how often a FloodWait is waited out before giving up
+MAX_MESSAGE_LENGTH = 4096
+FLOOD_WAIT_RETRIES = 5
+# Contracts Blockvision could not enrich are retried this often, and after
+# MAX_ENRICHMENT_ATTEMPTS tries stored without token data so the insight is not lost.
+ENRICHMENT_RETRY_SECONDS = 60
+MAX_ENRICHMENT_ATTEMPTS = 10
+MAX_DEFERRED_CONTRACTS = 1000
 
 # Debugging: Print the loaded values (optional)
 print(f"✅ Loaded Environment Variables:")
@@ -49,10 +78,10 @@ print(f"🔹 API ID: {api_id}")
 print(f"🔹 API Hash: {api_hash}")
 print(f"🔹 BOT API Key: {'✅ Set' if bot_api_key else '❌ Not Set'}")
 print(f"🔹 Target Channel ID: {target_channel_id}")
-print(f"🔹 Blockvision API Key: {'✅ Set' if BLOCKVISION_API_KEY else '❌ Not Set'}")
-
-# Global dictionary to track pending contracts and related messages
-pending_contracts = {}
+print(f"🔹 Blockvision API Key: {'✅ Set' if blockvision.api_key else '❌ Not Set'}")
+print(f"🔹 Blockvision rate limit: {blockvision.rate_limit:g} requests/s")
+print(f"🔹 Workers: {worker_count}, queue size: {queue_size} ({queue_policy})")
+print(f"🔹 Notify debounce: {notify_debounce}s, debug JSON: {'on' if send_debug_json else 'off'}")
 
 def format_number(number):
     """
@@ -69,152 +98,360 @@ def format_number(number):
     except (ValueError, TypeError):
         return "N/A"
 
-def save_insight_to_json(insight):
+def save_insights(insights):
     """
-    Append a new insight to the JSON file.
+    Add new insights to the shared insight store in a single transaction.
     """
     try:
-        try:
-            with open(INSIGHTS_FILE, "r") as f:
-                insights = json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            insights = []  # Start with an empty list if file not found or invalid
-        
-        insights.append(insight)
-        with open(INSIGHTS_FILE, "w") as f:
-            json.dump(insights, f, indent=4)
+        insight_store.add_many(insights)
     except Exception as e:
-        print(f"Error saving insight: {e}")
+        print(f"Error saving insights: {e}")
+
+def might_contain_contract(text):
+    """
+    Cheap substring check that rules out most messages before the regex runs.
+    """
+    return "0x" in text and "::" in text
+
+def extract_contracts(text):
+    """
+    Return every distinct Sui coin type in the text, in order of appearance.
+    """
+    return list(dict.fromkeys(contract_pattern.findall(text)))
+
+class PendingContracts:
+    """
+    Contracts waiting for a RickBurpBot analysis, keyed by coin type.
+
+    Only the sender is kept per contract. Entries expire after `ttl` seconds
+    and the oldest are evicted beyond `max_size`, so memory stays flat on a
+    long-running bot.
+    """
+
+    def __init__(self, ttl: float, max_size: int):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+
+    def add(self, contract: str, sender: str) -> None:
+        self._entries[contract] = {"sender": sender, "detected_at": time.monotonic()}
+        self._entries.move_to_end(contract)
+        self._evict()
+
+    def pop(self, contract: str) -> Optional[Dict]:
+        """Remove and return the entry for a contract, if it has not expired."""
+        self._evict()
+        return self._entries.pop(contract, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _evict(self) -> None:
+        # Entries are kept in detection order, so expired ones are at the front
+        cutoff = time.monotonic() - self.ttl
+        while self._entries:
+            entry = next(iter(self._entries.values()))
+            if entry["detected_at"] >= cutoff and len(self._entries) <= self.max_size:
+                break
+            self._entries.popitem(last=False)
+
+pending_contracts = PendingContracts(pending_ttl, pending_max_size)
+
+class ContractQueue:
+    """Bounded queue of detected contracts waiting to be processed.
+
+    Each job holds the contracts found in one message. put() never blocks,
+    so a message flood cannot stall the Telegram update loop. Contracts that
+    are already waiting are merged into the queued job instead of being
+    enriched twice, and when the queue is full the oldest or the new job is
+    dropped according to the policy.
+    """
+
+    def __init__(self, max_size: int, policy: str):
+        self.policy = policy
+        self._queue = asyncio.Queue(max_size)
+        self._queued: Dict[str, Dict] = {}
+        self.stats = {"queued": 0, "merged": 0, "dropped": 0}
+
+    def put(self, job: Dict) -> bool:
+        """Queue a job; returns False if it was merged or dropped."""
+        contracts = [contract for contract in job["contracts"] if contract not in self._queued]
+        if len(contracts) < len(job["contracts"]):
+            self.stats["merged"] += len(job["contracts"]) - len(contracts)
+            print(f"{len(job['contracts']) - len(contracts)} contract(s) already queued, merging")
+            if not contracts:
+                return False
+            job = dict(job, contracts=contracts)
+        if self._queue.full():
+            self.stats["dropped"] += 1
+            if self.policy == "drop_newest":
+                print(f"⚠️ Contract queue full, dropping {', '.join(contracts)}")
+                return False
+            oldest = self._queue.get_nowait()
+            self._queue.task_done()
+            self._forget(oldest)
+            print(f"⚠️ Contract queue full, dropping oldest {', '.join(oldest['contracts'])}")
+        self._queue.put_nowait(job)
+        for contract in contracts:
+            self._queued[contract] = job
+        self.stats["queued"] += 1
+        return True
+
+    def _forget(self, job: Dict) -> None:
+        for contract in job["contracts"]:
+            self._queued.pop(contract, None)
+
+    async def get(self) -> Dict:
+        job = await self._queue.get()
+        self._forget(job)
+        return job
+
+    def task_done(self) -> None:
+        self._queue.task_done()
+
+    def qsize(self) -> int:
+        return self._queue.qsize()
+
+contract_queue = ContractQueue(queue_size, queue_policy)
+
+# Contracts waiting for Blockvision to recover, by contract
+deferred_contracts: "OrderedDict[str, Dict]" = OrderedDict()
 
 # Initialize the Telegram client (using a session name for the bot)
 client = TelegramClient("session_bot", api_id, api_hash)
 
-async def fetch_blockvision_data(coin_type):
-    """Fetch coin data from Blockvision API."""
-    encoded_coin_type = quote(coin_type, safe="")
-    url = f"{BLOCKVISION_API_URL}?coinType={encoded_coin_type}"
-    headers = {"accept": "application/json", "x-api-key": BLOCKVISION_API_KEY}
-    
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url, headers=headers) as response:
-            if response.status == 200:
-                data = await response.json()
-                print("Blockvision API Response:", data)
-                return data.get("result", {})
-            else:
-                print(f"Failed to fetch data from Blockvision: {response.status}")
-                return None
-
-async def fetch_blockvision_holders(coin_type, page_index=1, page_size=10):
-    """Fetch coin holders data from Blockvision API."""
-    encoded_coin_type = quote(coin_type, safe="")
-    url = f"{BLOCKVISION_HOLDERS_API_URL}?coinType={encoded_coin_type}&pageIndex={page_index}&pageSize={page_size}"
-    headers = {"accept": "application/json", "x-api-key": BLOCKVISION_API_KEY}
-    
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url, headers=headers) as response:
-            if response.status == 200:
-                data = await response.json()
-                print("Blockvision Holders API Response:", data)
-                return data.get("result", {}).get("data", [])
-            else:
-                print(f"Failed to fetch holders data from Blockvision: {response.status}")
-                return None
+def build_insight(contract, username, blockvision_data, holders_data):
+    """
+    Build a telegram insight from Blockvision coin detail and top 10 holders data.
+    """
+    if holders_data:
+        top_10_holders_percentage = sum(float(holder.get("percentage", 0)) for holder in holders_data)
+        top_10_holders_percentage = round(top_10_holders_percentage * 100, 2)
+    else:
+        top_10_holders_percentage = "N/A"
+
+    return {
+        "contract": contract,
+        "sender": username,
+        "name": blockvision_data.get("name", "N/A"),
+        "symbol": blockvision_data.get("symbol", "N/A"),
+        "price": blockvision_data.get("price", "N/A"),
+        "price_change_24h": f"{blockvision_data.get('priceChangePercentage24H', 'N/A')}%",
+        "total_supply": format_number(blockvision_data.get("totalSupply", "N/A")),
+        "holders": format_number(blockvision_data.get("holders", "N/A")),
+        "market_cap": format_number(blockvision_data.get("marketCap", "N/A")),
+        "top_10_holders_percentage": f"{top_10_holders_percentage}%",
+        "verified": blockvision_data.get("verified", "N/A"),
+        "scam_flag": "None" if blockvision_data.get("scamFlag", 0) == 0 else "Scam Detected",
+        "timestamp": datetime.utcnow().isoformat(),
+        "source": "telegram"
+    }
+
+def format_insight_message(insight):
+    """
+    Build the message sent to the target channel for an insight.
+    """
+    return (
+        f"Contract Detected:\n{insight['contract']}\n\n"
+        f"Sent by: {insight['sender']}\n\n"
+        f"Name: {insight['name']}\n"
+        f"Symbol: {insight['symbol']}\n"
+        f"Price: {insight['price']}\n"
+        f"24h Price Change: {insight['price_change_24h']}\n"
+        f"Total Supply: {insight['total_supply']}\n"
+        f"Holders: {insight['holders']}\n"
+        f"Market Cap: {insight['market_cap']}\n"
+        f"Top 10 Holders: {insight['top_10_holders_percentage']}\n"
+        f"Verified: {insight['verified']}\n"
+        f"Scam Flag: {insight['scam_flag']}\n"
+        f"Source: telegram\n"
+    )
+
+async def process_contracts(job):
+    """
+    Enrich the contracts from one message as a batch, save them together and notify the target channel.
+    """
+    username = job["sender"]
+    contracts = job["contracts"]
+    attempts = job.get("enrichment_attempts", 0) + 1
+    # All lookups share the pooled Blockvision client and run concurrently
+    results = await asyncio.gather(
+        *(blockvision.fetch_coin_snapshot(contract) for contract in contracts),
+        return_exceptions=True,
+    )
+
+    insights = []
+    messages = []
+    for contract, result in zip(contracts, results):
+        if isinstance(result, BlockvisionUnavailable):
+            print(f"Blockvision unavailable for {contract}: {result}")
+            if attempts < MAX_ENRICHMENT_ATTEMPTS:
+                defer_contract(contract, username, attempts)
+                if attempts == 1:
+                    reason = "is rate limiting requests" if result.throttled else "is currently unavailable"
+                    messages.append(
+                        f"Contract Detected:\n{contract}\n\n"
+                        f"Sent by: {username}\n\n"
+                        f"Blockvision {reason}; retrying contract data in {ENRICHMENT_RETRY_SECONDS}s."
+                    )
+                continue
+            print(f"⚠️ Giving up on token data for {contract}")
+            insight = build_insight(contract, username, {}, None)
+            insights.append(insight)
+            messages.append(format_insight_message(insight))
+        elif isinstance(result, Exception):
+            print(f"Error processing contract {contract}: {result}")
+        elif result[0]:
+            insight = build_insight(contract, username, *result)
+            insights.append(insight)
+            messages.append(format_insight_message(insight))
+            if send_debug_json:
+                debug_json = json.dumps(insight, indent=4)
+                messages.append(f"Debug JSON:\n```{debug_json}```")
+        else:
+            # Fallback message if Blockvision returns no data
+            messages.append(
+                f"Contract Detected:\n{contract}\n\n"
+                f"Sent by: {username}\n\n"
+                f"Blockvision does not support this contract."
+            )
+
+    # Save the whole batch to the shared store in one transaction
+    if insights:
+        save_insights(insights)
+
+    for text in messages:
+        notifier.notify(text)
+
+def defer_contract(contract, username, attempts):
+    """Keep a contract for another enrichment attempt later."""
+    deferred_contracts[contract] = {"contracts": [contract], "sender": username, "enrichment_attempts": attempts}
+    deferred_contracts.move_to_end(contract)
+    if len(deferred_contracts) > MAX_DEFERRED_CONTRACTS:
+        dropped, _ = deferred_contracts.popitem(last=False)
+        print(f"⚠️ Too many deferred contracts, dropping {dropped}")
+    print(f"⏳ Contract {contract} deferred, retrying enrichment in {ENRICHMENT_RETRY_SECONDS}s "
+          f"(attempt {attempts}/{MAX_ENRICHMENT_ATTEMPTS})")
+
+async def retry_deferred_contracts():
+    """Periodically retry enriching contracts Blockvision could not handle earlier."""
+    while True:
+        await asyncio.sleep(ENRICHMENT_RETRY_SECONDS)
+        jobs = list(deferred_contracts.values())
+        deferred_contracts.clear()
+        results = await asyncio.gather(*(process_contracts(job) for job in jobs), return_exceptions=True)
+        for job, result in zip(jobs, results):
+            if isinstance(result, Exception):
+                print(f"Error retrying contract {job['contracts'][0]}: {result}")
+
+async def contract_worker(worker_id):
+    """Process queued contracts until cancelled."""
+    while True:
+        job = await contract_queue.get()
+        try:
+            await process_contracts(job)
+        except Exception as e:
+            print(f"Worker {worker_id} failed on {', '.join(job['contracts'])}: {e}")
+        finally:
+            contract_queue.task_done()
+
+class ChannelNotifier:
+    """
+    Outbound message queue for the target channel.
+
+    notify() returns immediately. A background task waits `debounce` seconds
+    after the first pending notification, joins everything queued by then
+    into as few messages as Telegram's length limit allows and sends them.
+    A FloodWait is waited out in that task and the send retried, while new
+    notifications keep queueing up for the next batch.
+    """
+
+    def __init__(self, telegram_client, chat_id, debounce: float, max_pending: int = 1000):
+        self.client = telegram_client
+        self.chat_id = chat_id
+        self.debounce = debounce
+        self._pending = deque(maxlen=max_pending)
+        self._wakeup = asyncio.Event()
+        self.stats = {"notifications": 0, "messages_sent": 0, "flood_waits": 0, "dropped": 0, "failed": 0}
+
+    def notify(self, text: str) -> None:
+        if len(self._pending) == self._pending.maxlen:
+            self.stats["dropped"] += 1
+            print("⚠️ Notification queue full, dropping oldest notification")
+        self._pending.append(text)
+        self.stats["notifications"] += 1
+        self._wakeup.set()
+
+    @staticmethod
+    def _batches(texts):
+        batch = ""
+        for text in texts:
+            if batch and len(batch) + 2 + len(text) > MAX_MESSAGE_LENGTH:
+                yield batch
+                batch = ""
+            batch = f"{batch}\n\n{text}" if batch else text
+        if batch:
+            yield batch
+
+    async def _send(self, text: str) -> None:
+        for attempt in range(FLOOD_WAIT_RETRIES + 1):
+            try:
+                await self.client.send_message(self.chat_id, text)
+                self.stats["messages_sent"] += 1
+                return
+            except FloodWaitError as e:
+                self.stats["flood_waits"] += 1
+                print(f"⚠️ FloodWait from Telegram, retrying in {e.seconds}s")
+                await asyncio.sleep(e.seconds)
+            except Exception as e:
+                print(f"Error sending notification: {e}")
+                break
+        self.stats["failed"] += 1
+
+    async def run(self) -> None:
+        """Send queued notifications until cancelled."""
+        while True:
+            await self._wakeup.wait()
+            await asyncio.sleep(self.debounce)
+            self._wakeup.clear()
+            texts = list(self._pending)
+            self._pending.clear()
+            for batch in self._batches(texts):
+                await self._send(batch)
+
+notifier = ChannelNotifier(client, target_channel_id, notify_debounce)
 
 # Listen to any new message in any chat where the bot is present
 @client.on(events.NewMessage)
 async def handler(event):
-    sender = await event.get_sender()
-    username = f"@{sender.username}" if sender.username else "Unknown"
     message_text = event.message.text or ""
-    
-    # Detect a Sui contract in the message text
-    match = re.search(contract_regex, message_text)
-    if match:
-        try:
-            contract = match.group(1)
-            print(f"Detected contract: {contract}")
-            pending_contracts[contract] = {"message": event.message, "sender": username}
-            
-            # Fetch data from Blockvision API for the detected contract
-            blockvision_data = await fetch_blockvision_data(contract)
-            if blockvision_data:
-                name = blockvision_data.get("name", "N/A")
-                symbol = blockvision_data.get("symbol", "N/A")
-                price = blockvision_data.get("price", "N/A")
-                price_change_24h = blockvision_data.get("priceChangePercentage24H", "N/A")
-                total_supply = format_number(blockvision_data.get("totalSupply", "N/A"))
-                holders = format_number(blockvision_data.get("holders", "N/A"))
-                market_cap = format_number(blockvision_data.get("marketCap", "N/A"))
-                is_verified = blockvision_data.get("verified", "N/A")
-                scam_flag = "None" if blockvision_data.get("scamFlag", 0) == 0 else "Scam Detected"
-                
-                # Fetch top 10 holders data
-                holders_data = await fetch_blockvision_holders(contract)
-                if holders_data:
-                    top_10_holders_percentage = sum(float(holder.get("percentage", 0)) for holder in holders_data)
-                    top_10_holders_percentage = round(top_10_holders_percentage * 100, 2)
-                else:
-                    top_10_holders_percentage = "N/A"
-                
-                # Build the insight dictionary
-                insight = {
-                    "contract": contract,
-                    "sender": username,
-                    "name": name,
-                    "symbol": symbol,
-                    "price": price,
-                    "price_change_24h": f"{price_change_24h}%",
-                    "total_supply": total_supply,
-                    "holders": holders,
-                    "market_cap": market_cap,
-                    "top_10_holders_percentage": f"{top_10_holders_percentage}%",
-                    "verified": is_verified,
-                    "scam_flag": scam_flag,
-                    "timestamp": datetime.utcnow().isoformat(),
-                    "source": "telegram"
-                }
-                
-                # Save the insight to a JSON file
-                save_insight_to_json(insight)
-                
-                # Build a message to be sent to the target channel
-                combined_text = (
-                    f"Contract Detected:\n{contract}\n\n"
-                    f"Sent by: {username}\n\n"
-                    f"Name: {name}\n"
-                    f"Symbol: {symbol}\n"
-                    f"Price: {price}\n"
-                    f"24h Price Change: {price_change_24h}%\n"
-                    f"Total Supply: {total_supply}\n"
-                    f"Holders: {holders}\n"
-                    f"Market Cap: {market_cap}\n"
-                    f"Top 10 Holders: {top_10_holders_percentage}%\n"
-                    f"Verified: {is_verified}\n"
-                    f"Scam Flag: {scam_flag}\n"
-                    f"Source: telegram\n"
-                )
-                
-                await client.send_message(target_channel_id, combined_text)
-                debug_json = json.dumps(insight, indent=4)
-                await client.send_message(target_channel_id, f"Debug JSON:\n```{debug_json}```")
-            else:
-                # Fallback message if Blockvision returns no data
-                combined_text = (
-                    f"Contract Detected:\n{contract}\n\n"
-                    f"Sent by: {username}\n\n"
-                    f"Blockvision does not support this contract."
-                )
-                await client.send_message(target_channel_id, combined_text)
-        except Exception as e:
-            print(f"Error processing contract: {e}")
-    else:
+    # Most chat messages carry no contract: skip them without running the regex
+    # or resolving the sender. RickBurpBot replies only matter if they quote one.
+    if not might_contain_contract(message_text):
+        return
+    contracts = extract_contracts(message_text)
+    if not contracts:
         print("No contract address detected in the message.")
+        return
+
+    sender = await event.get_sender()
+    sender_username = getattr(sender, "username", None)
+    username = f"@{sender_username}" if sender_username else "Unknown"
+
+    is_rick = sender_username == "RickBurpBot"
+
+    # Queue every Sui contract in the message text
+    for contract in contracts:
+        print(f"Detected contract: {contract}")
+        if not is_rick:
+            pending_contracts.add(contract, username)
+    contract_queue.put({"contracts": contracts, "sender": username})
     
-    # Handle messages from RickBurpBot (if present)
-    if sender.username == "RickBurpBot":
-        for contract, data in list(pending_contracts.items()):
-            if contract in message_text:
+    # Match RickBurpBot replies to pending contracts by the coin types they quote
+    if is_rick:
+        for contract in contracts:
+            data = pending_contracts.pop(contract)
+            if data is not None:
                 print(f"Analysis found for contract: {contract}")
                 combined_text = (
                     f"Contract Detected:\n{contract}\n\n"
@@ -222,8 +459,7 @@ async def handler(event):
                     f"Analysis by RickBurpBot:\n{message_text}\n"
                     f"Source: telegram\n"
                 )
-                await client.send_message(target_channel_id, combined_text)
-                del pending_contracts[contract]
+                notifier.notify(combined_text)
                 break
 
 async def main():
@@ -233,8 +469,21 @@ async def main():
     # Start the client using the bot token from .env
     await client.start(bot_token=bot_api_key)
     
+    workers = [asyncio.create_task(contract_worker(i)) for i in range(worker_count)]
+    workers.append(asyncio.create_task(notifier.run()))
+    workers.append(asyncio.create_task(retry_deferred_contracts()))
     print("Bot is running. Waiting for messages...")
-    await client.run_until_disconnected()
+    try:
+        await client.run_until_disconnected()
+    finally:
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        print(f"Contract queue stats: {contract_queue.stats}")
+        print(f"Notification stats: {notifier.stats}")
+        if deferred_contracts:
+            print(f"⚠️ {len(deferred_contracts)} contract(s) still waiting for Blockvision were not stored")
+        await blockvision.close()
 
 if __name__ == "__main__":
     asyncio.run(main())
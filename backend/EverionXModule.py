@@ -1,30 +1,92 @@
+import asyncio
+import json
 import os
+import random
 from dotenv import load_dotenv
-import requests
-from bs4 import BeautifulSoup
+import aiohttp
 import re
 import time
-import json
 import traceback
+from collections import OrderedDict
 from datetime import datetime, timezone
-from urllib.parse import quote
+from typing import List, Optional
+from insight_store import open_insight_store
+from blockvision import BlockvisionClient, BlockvisionUnavailable, TokenBucket
+from nitter_parser import get_timeline_parser, timeline_fingerprint
+
+try:
+    # aiohttp decodes brotli responses when one of these is installed
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        ACCEPT_ENCODING = "gzip, deflate, br"
+    except ImportError:
+        ACCEPT_ENCODING = "gzip, deflate"
 
 # Load environment variables
 load_dotenv()
 
-# Base configuration
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-MARKET_INSIGHTS_FILE = os.path.join(BASE_DIR, "market_insights.json")
-
-# Blockvision API configurations
-BLOCKVISION_API_URL = "https://api.blockvision.org/v2/sui/coin/detail"
-BLOCKVISION_HOLDERS_API_URL = "https://api.blockvision.org/v2/sui/coin/holders"
-BLOCKVISION_API_KEY = os.getenv("BLOCKVISION_API_KEY")
+# Shared insight store, also read by the API server
+insight_store = open_insight_store()
 
 # Add error handling for the API key
-if not BLOCKVISION_API_KEY:
+if not os.getenv("BLOCKVISION_API_KEY"):
     raise ValueError("❌ Environment variable BLOCKVISION_API_KEY is not set in .env file!")
 
+# Upper bound on remembered tweet ids; the store's unique index still catches evicted ones.
+MAX_SEEN_TWEET_IDS = 100_000
+# Timeline tweet ids remembered per account; a Nitter page shows about 20
+MAX_TIMELINE_IDS = 200
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SETTINGS_FILE = os.path.join(BASE_DIR, "settings.json")
+DEFAULT_ACCOUNTS = ["163ba6y"]
+# Nitter profile pages fetched at once, across all accounts
+MAX_CONCURRENT_FETCHES = int(os.getenv("X_MAX_CONCURRENT_FETCHES", "8"))
+# Longest an account is skipped after repeated fetch errors
+MAX_BACKOFF_SECONDS = 600
+# Adaptive polling: an account's interval halves (down to the minimum) when it
+# posts and grows by IDLE_INTERVAL_GROWTH (up to the maximum) while it is quiet.
+MIN_POLL_INTERVAL = float(os.getenv("X_MIN_POLL_INTERVAL", "10"))
+MAX_POLL_INTERVAL = float(os.getenv("X_MAX_POLL_INTERVAL", "900"))
+IDLE_INTERVAL_GROWTH = 1.5
+# Each poll is moved by up to this fraction of its interval so accounts do not fire together
+POLL_JITTER = 0.2
+# Nitter page fetches allowed per minute across all accounts
+REQUESTS_PER_MINUTE = float(os.getenv("X_REQUESTS_PER_MINUTE", "60"))
+# Contract tweets Blockvision could not enrich are retried this often, and after
+# MAX_ENRICHMENT_ATTEMPTS tries stored without token data so the tweet is not lost.
+ENRICHMENT_RETRY_SECONDS = 60
+MAX_ENRICHMENT_ATTEMPTS = 10
+MAX_DEFERRED_TWEETS = 1000
+
+def load_accounts() -> List[str]:
+    """Accounts to watch: X_ACCOUNTS, else x_accounts from settings.json, else the default.
+
+    Both are comma separated handles; settings.json may also hold a list of
+    them. A leading @ is ignored, as are values of any other type.
+    """
+    value = os.getenv("X_ACCOUNTS")
+    if not value:
+        try:
+            with open(SETTINGS_FILE, "r", encoding="utf-8") as f:
+                value = json.load(f).get("x_accounts")
+        except (OSError, ValueError, AttributeError):
+            value = None
+    if isinstance(value, str):
+        value = [value]
+    elif not isinstance(value, list):
+        value = []
+    accounts = [
+        handle.strip().lstrip("@")
+        for item in value if isinstance(item, str)
+        for handle in item.split(",")
+    ]
+    accounts = list(dict.fromkeys(handle for handle in accounts if handle))
+    return accounts or list(DEFAULT_ACCOUNTS)
+
 def format_number(number):
     """Format a number to use K for thousands and M for millions."""
     try:
@@ -38,87 +100,103 @@ def format_number(number):
     except (ValueError, TypeError):
         return "N/A"
 
-def save_insight_to_json(insight):
-    """Save market insight to JSON file, appending to existing insights."""
-    try:
-        # Load existing JSON file if available
-        try:
-            with open(MARKET_INSIGHTS_FILE, "r", encoding='utf-8') as f:
-                insights = json.load(f)
-                if not isinstance(insights, list):
-                    insights = []
-        except (FileNotFoundError, json.JSONDecodeError):
-            insights = []  # Create new list if file doesn't exist
-
-        # Check for duplicate tweet_id
-        if insight.get('tweet_id'):
-            exists = any(
-                existing.get('tweet_id') == insight['tweet_id']
-                for existing in insights
-            )
-            if exists:
-                print(f"⚠️ Tweet {insight['tweet_id']} already exists, skipping")
-                return
-
-        # Insert new insight at the beginning
-        insights.insert(0, insight)
-
-        # Save updated JSON
-        with open(MARKET_INSIGHTS_FILE, "w", encoding='utf-8') as f:
-            json.dump(insights, f, indent=4, ensure_ascii=False)
-            print(f"✅ Successfully saved insight to {MARKET_INSIGHTS_FILE}")
-            print(f"Current insights count: {len(insights)}")
+def save_insights(insights) -> bool:
+    """Save market insights to the shared store in one transaction, skipping tweets already stored.
 
-    except Exception as e:
-        print(f"Error saving insight: {e}")
-        traceback.print_exc()
-
-def fetch_blockvision_data(coin_type):
-    """Fetch coin data from Blockvision API synchronously."""
-    encoded_coin_type = quote(coin_type, safe="")
-    url = f"{BLOCKVISION_API_URL}?coinType={encoded_coin_type}"
-    headers = {"accept": "application/json", "x-api-key": BLOCKVISION_API_KEY}
+    Returns True if the insights are in the store afterwards.
+    """
     try:
-        response = requests.get(url, headers=headers, timeout=10)
-        if response.status_code == 200:
-            data = response.json()
-            print("Blockvision API Response:", data)
-            return data.get("result", {})
-        else:
-            print(f"Failed to fetch data from Blockvision: {response.status_code}")
-            return None
+        for insight, added in zip(insights, insight_store.add_many(insights)):
+            if added:
+                print(f"✅ Successfully saved tweet {insight['tweet_id']} to {insight_store.path}")
+            else:
+                print(f"⚠️ Tweet {insight['tweet_id']} already exists, skipping")
+        return True
     except Exception as e:
-        print(f"Error fetching Blockvision data: {e}")
+        print(f"Error saving insights: {e}")
         traceback.print_exc()
-        return None
-
-def fetch_blockvision_holders(coin_type, page_index=1, page_size=10):
-    """Fetch holder data from Blockvision API synchronously."""
-    encoded_coin_type = quote(coin_type, safe="")
-    url = f"{BLOCKVISION_HOLDERS_API_URL}?coinType={encoded_coin_type}&pageIndex={page_index}&pageSize={page_size}"
-    headers = {"accept": "application/json", "x-api-key": BLOCKVISION_API_KEY}
-    try:
-        response = requests.get(url, headers=headers, timeout=10)
-        if response.status_code == 200:
-            data = response.json()
-            print("Blockvision Holders API Response:", data)
-            return data.get("result", {}).get("data", [])
+        return False
+
+class SeenTweetIds:
+    """LRU set of tweet ids already stored, so duplicates are skipped before any enrichment work."""
+
+    def __init__(self, tweet_ids, max_size: int = MAX_SEEN_TWEET_IDS):
+        self.max_size = max_size
+        self._ids = OrderedDict()
+        for tweet_id in tweet_ids:
+            self.add(tweet_id)
+
+    @staticmethod
+    def _key(tweet_id) -> str:
+        # Ids stored by older versions still end in Nitter's "#m" link suffix
+        return str(tweet_id).split('#')[0]
+
+    def __contains__(self, tweet_id) -> bool:
+        tweet_id = self._key(tweet_id)
+        if tweet_id in self._ids:
+            self._ids.move_to_end(tweet_id)
+            return True
+        return False
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def add(self, tweet_id) -> None:
+        tweet_id = self._key(tweet_id)
+        self._ids[tweet_id] = None
+        self._ids.move_to_end(tweet_id)
+        if len(self._ids) > self.max_size:
+            self._ids.popitem(last=False)
+
+class AccountState:
+    """Polling state for one watched account."""
+
+    def __init__(self, handle: str, interval: float = 30):
+        self.handle = handle
+        # Tweet ids seen on the timeline, oldest first; empty until the first poll
+        self.timeline_ids = OrderedDict()
+        self.failures = 0
+        self.interval = interval
+        self.next_poll_at = 0.0
+        # Validators and timeline fingerprint from the last full fetch
+        self.etag = None
+        self.last_modified = None
+        self.timeline_hash = None
+
+    def record_success(self) -> None:
+        self.failures = 0
+
+    def remember(self, tweet_ids) -> None:
+        for tweet_id in tweet_ids:
+            self.timeline_ids[tweet_id] = None
+            self.timeline_ids.move_to_end(tweet_id)
+        while len(self.timeline_ids) > MAX_TIMELINE_IDS:
+            self.timeline_ids.popitem(last=False)
+
+    def record_failure(self, check_interval: float) -> None:
+        """Skip this account for exponentially longer after each consecutive failure."""
+        self.failures += 1
+        delay = min(MAX_BACKOFF_SECONDS, check_interval * 2 ** (self.failures - 1))
+        self.next_poll_at = time.monotonic() + delay
+        print(f"⚠️ @{self.handle} failed {self.failures} time(s), backing off {delay:.0f}s")
+
+    def schedule(self, found_new: bool, base_interval: float) -> None:
+        """Adapt the poll interval to the account's activity and set the next, jittered, poll time."""
+        if found_new:
+            self.interval = max(MIN_POLL_INTERVAL, min(self.interval, base_interval) / 2)
         else:
-            print(f"Failed to fetch holders data from Blockvision: {response.status_code}")
-            return None
-    except Exception as e:
-        print(f"Error fetching Blockvision holders data: {e}")
-        traceback.print_exc()
-        return None
+            self.interval = min(MAX_POLL_INTERVAL, self.interval * IDLE_INTERVAL_GROWTH)
+        jitter = random.uniform(1 - POLL_JITTER, 1 + POLL_JITTER)
+        self.next_poll_at = time.monotonic() + self.interval * jitter
 
 class NitterMonitor:
-    def __init__(self):
-        """Initialize the Nitter-based monitor."""
+    def __init__(self, accounts: Optional[List[str]] = None):
+        """Initialize the Nitter-based monitor for the given accounts."""
         self.base_url = "https://nitter.net"
         self.twitter_base_url = "https://x.com"
         self.contract_regex = r"(0x[a-fA-F0-9]{64}::[a-zA-Z0-9_]+::[a-zA-Z0-9_]+)"
-        self.test_account = "163ba6y"
-        self.last_tweet_id = None
+        self.accounts = {handle: AccountState(handle) for handle in (accounts or load_accounts())}
+        self.check_interval = 30
         self.headers = {
             'User-Agent': (
                 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) '
@@ -126,108 +204,127 @@ class NitterMonitor:
                 'Chrome/120.0.0.0 Safari/537.36'
             ),
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5'
+            'Accept-Language': 'en-US,en;q=0.5',
+            'Accept-Encoding': ACCEPT_ENCODING,
         }
-        self.session = requests.Session()
-        self._ensure_insights_file()
-
-    def _ensure_insights_file(self):
-        """Ensure the insights file exists and is valid JSON."""
-        try:
-            if not os.path.exists(MARKET_INSIGHTS_FILE):
-                with open(MARKET_INSIGHTS_FILE, 'w', encoding='utf-8') as f:
-                    json.dump([], f, indent=4)
-                print(f"Created new insights file: {MARKET_INSIGHTS_FILE}")
-            else:
-                # Verify file is valid JSON
-                with open(MARKET_INSIGHTS_FILE, 'r', encoding='utf-8') as f:
-                    try:
-                        data = json.load(f)
-                        if not isinstance(data, list):
-                            raise ValueError("File contains invalid data structure")
-                    except json.JSONDecodeError:
-                        print("Warning: Invalid JSON in insights file, resetting...")
-                        with open(MARKET_INSIGHTS_FILE, 'w', encoding='utf-8') as f:
-                            json.dump([], f, indent=4)
-        except Exception as e:
-            print(f"Error ensuring insights file: {e}")
-            traceback.print_exc()
+        # Fastest installed timeline parser (selectolax, lxml, then bs4), or NITTER_PARSER
+        self.parse_timeline = get_timeline_parser()
+        print(f"Using Nitter parser: {self.parse_timeline.__name__}")
+        self.stats = {"fetches": 0, "not_modified": 0, "unchanged": 0, "parsed": 0}
+        # Global Nitter request budget shared by every account
+        self.budget = TokenBucket(REQUESTS_PER_MINUTE / 60, max(1.0, REQUESTS_PER_MINUTE / 6))
+        # Created in monitor(), inside the running event loop
+        self.session: Optional[aiohttp.ClientSession] = None
+        # Shared pooled Blockvision client
+        self.blockvision = BlockvisionClient(scope="x")
+        # Rebuilt once from the store; updated as tweets are saved
+        self.seen_tweet_ids = SeenTweetIds(insight_store.live_tweet_ids())
+        # Contract tweets waiting for Blockvision to recover, by tweet id
+        self.deferred_tweets = OrderedDict()
+        print(f"Loaded {len(self.seen_tweet_ids)} known tweet ids")
 
     def extract_contract_address(self, text: str) -> str:
         """Extract a Sui contract address from the text using regex."""
         match = re.search(self.contract_regex, text)
         return match.group(1) if match else None
 
-    def check_new_tweets(self) -> dict:
-        """Check for new tweets from the test account via Nitter."""
-        url = f"{self.base_url}/{self.test_account}"
+    def parse_tweet(self, item: dict, account: AccountState) -> dict:
+        """Build tweet data from one parsed timeline item."""
+        tweet_id = item['tweet_id']
+        return {
+            'account': account.handle,
+            'tweet_id': tweet_id,
+            'text': item['text'],
+            'created_at': item['created_at'] or datetime.now(timezone.utc).isoformat(),
+            'tweet_link': f"{self.twitter_base_url}/{account.handle}/status/{tweet_id}",
+            'contract_address': self.extract_contract_address(item['text'])
+        }
+
+    async def check_new_tweets(self, account: AccountState) -> List[dict]:
+        """Return every tweet above the last one already seen on an account's timeline, oldest first.
+
+        The timeline is newest first, so new tweets are the ones above the
+        first already-seen tweet. Tweets are matched by id rather than
+        compared by it, so a retweet of an older tweet still counts as new,
+        while older tweets scrolling back onto the page do not. On the first
+        poll of an account only its newest tweet is returned.
+        """
+        url = f"{self.base_url}/{account.handle}"
         try:
             print(f"\nChecking tweets at: {url}")
-            response = self.session.get(url, headers=self.headers, timeout=10)
-            response.raise_for_status()
-
-            soup = BeautifulSoup(response.text, 'html.parser')
-            tweets = soup.find_all('div', class_='timeline-item')
-            if not tweets:
+            headers = {}
+            if account.etag:
+                headers['If-None-Match'] = account.etag
+            if account.last_modified:
+                headers['If-Modified-Since'] = account.last_modified
+            self.stats["fetches"] += 1
+            async with self.session.get(url, headers=headers) as response:
+                if response.status == 304:
+                    account.record_success()
+                    self.stats["not_modified"] += 1
+                    return []
+                response.raise_for_status()
+                html = await response.text()
+                # Only kept once the page has been handled, so a failed parse is fetched again
+                validators = (response.headers.get('ETag'), response.headers.get('Last-Modified'))
+            account.record_success()
+
+            # Same tweets as last time: skip the parse
+            fingerprint = timeline_fingerprint(html)
+            if fingerprint is not None and fingerprint == account.timeline_hash:
+                self.stats["unchanged"] += 1
+                account.etag, account.last_modified = validators
+                return []
+            self.stats["parsed"] += 1
+
+            items = self.parse_timeline(html)
+            if not items:
                 print("No tweets found")
-                return None
-
-            tweet = None
-            for t in tweets:
-                if not t.find('div', class_='pinned'):
-                    tweet = t
-                    break
+                return []
 
-            if tweet is None:
+            tweets = [self.parse_tweet(item, account) for item in items if not item['pinned']]
+            if not tweets:
                 print("No non-pinned tweets found")
-                return None
-
-            content = tweet.find('div', class_='tweet-content')
-            if not content:
-                print("No tweet content found")
-                return None
-
-            tweet_text = content.get_text(strip=True)
-            permalink_tag = tweet.find('a', class_='tweet-link')
-            if not permalink_tag or not permalink_tag.get('href'):
-                print("No tweet link found")
-                return None
-
-            tweet_link_fragment = permalink_tag['href']
-            tweet_id = tweet_link_fragment.split('/')[-1]
-
-            if tweet_id == self.last_tweet_id:
-                return None
-            self.last_tweet_id = tweet_id
-
-            tweet_time = datetime.now(timezone.utc).isoformat()
-            timestamp_tag = tweet.find('span', class_='tweet-date')
-            if timestamp_tag and timestamp_tag.find('a'):
-                tweet_time = timestamp_tag.find('a').get('title', tweet_time)
-
-            complete_tweet_link = f"{self.twitter_base_url}/{self.test_account}/status/{tweet_id}"
-
-            return {
-                'tweet_id': tweet_id,
-                'text': tweet_text,
-                'created_at': tweet_time,
-                'tweet_link': complete_tweet_link,
-                'contract_address': self.extract_contract_address(tweet_text)
-            }
+                return []
 
-        except requests.exceptions.RequestException as e:
-            print(f"Request error: {e}")
-            traceback.print_exc()
-            return None
+            new_tweets = []
+            for tweet in tweets:
+                if tweet['tweet_id'] in account.timeline_ids:
+                    break
+                new_tweets.append(tweet)
+            if not account.timeline_ids:
+                new_tweets = new_tweets[:1]
+            account.remember(t['tweet_id'] for t in reversed(tweets))
+            new_tweets.reverse()
+            account.timeline_hash = fingerprint
+            account.etag, account.last_modified = validators
+            return new_tweets
+
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"Request error for @{account.handle}: {e!r}")
+            account.record_failure(self.check_interval)
+            return []
         except Exception as e:
             print(f"Error processing tweets: {e}")
             traceback.print_exc()
-            return None
+            return []
+
+    async def process_contract_tweet(self, tweet_data: dict) -> dict:
+        """Process tweets that contain a contract address.
 
-    def process_contract_tweet(self, tweet_data: dict) -> dict:
-        """Process tweets that contain a contract address."""
+        Raises BlockvisionUnavailable while Blockvision is throttling, failing
+        or timing out, unless this is the tweet's last enrichment attempt; then
+        it is stored without token data.
+        """
         contract = tweet_data['contract_address']
-        blockvision_data = fetch_blockvision_data(contract)
+        try:
+            blockvision_data, holders_data = await self.blockvision.fetch_coin_snapshot(contract)
+        except BlockvisionUnavailable as e:
+            print(f"⚠️ Blockvision unavailable for {contract}: {e}")
+            if tweet_data.get('enrichment_attempts', 0) + 1 < MAX_ENRICHMENT_ATTEMPTS:
+                raise
+            print(f"⚠️ Giving up on token data for tweet {tweet_data['tweet_id']}")
+            blockvision_data, holders_data = None, None
         
         if blockvision_data:
             name = blockvision_data.get("name", "N/A")
@@ -240,7 +337,6 @@ class NitterMonitor:
             is_verified = blockvision_data.get("verified", False)
             scam_flag = "None" if blockvision_data.get("scamFlag", 0) == 0 else "Scam Detected"
 
-            holders_data = fetch_blockvision_holders(contract)
             if holders_data:
                 try:
                     top_10_holders_percentage = sum(float(holder.get("percentage", 0)) for holder in holders_data)
@@ -254,7 +350,7 @@ class NitterMonitor:
             insight = {
                 "type": "token_insight",
                 "contract": contract,
-                "sender": f"@{self.test_account}",
+                "sender": f"@{tweet_data['account']}",
                 "name": name,
                 "symbol": symbol,
                 "price": price,
@@ -276,7 +372,7 @@ class NitterMonitor:
             insight = {
                 "type": "token_insight",
                 "contract": contract,
-                "sender": f"@{self.test_account}",
+                "sender": f"@{tweet_data['account']}",
                 "name": "Unknown",
                 "symbol": "Unknown",
                 "price": "N/A",
@@ -298,7 +394,7 @@ class NitterMonitor:
 
     def process_non_contract_tweet(self, tweet_data: dict) -> dict:
         """Process tweets that do not contain a contract address."""
-        summary = f"@{self.test_account}: {tweet_data['text']} 🔗"
+        summary = f"@{tweet_data['account']}: {tweet_data['text']} 🔗"
         insight = {
             "type": "market_insight",
             "tweet_id": tweet_data['tweet_id'],
@@ -311,64 +407,147 @@ class NitterMonitor:
         }
         return insight
 
-    def monitor(self, check_interval: int = 30, duration: int = 300) -> None:
-        """Monitor tweets with improved error handling and file management."""
-        print(f"\nStarting Nitter monitor for @{self.test_account}")
-        print(f"Will check every {check_interval} seconds for {duration} seconds")
+    async def build_insight(self, tweet_data: dict) -> dict:
+        """Turn one new tweet into an insight, enriching it if it names a contract."""
+        print(f"\n🔥 New tweet detected from @{tweet_data['account']}!")
+        print(f"Time: {tweet_data['created_at']}")
+        print(f"Text: {tweet_data['text']}")
+
+        if tweet_data['contract_address']:
+            print(f"✨ Contract found: {tweet_data['contract_address']}")
+            return await self.process_contract_tweet(tweet_data)
+        print("ℹ️ No contract address found - processing as market insight")
+        return self.process_non_contract_tweet(tweet_data)
+
+    async def handle_tweets(self, tweets: List[dict]) -> None:
+        """Enrich a batch of new tweets concurrently and store them together, oldest first."""
+        new_tweets = []
+        for tweet_data in tweets:
+            if tweet_data['tweet_id'] in self.seen_tweet_ids:
+                print(f"⚠️ Tweet {tweet_data['tweet_id']} already stored, skipping")
+            else:
+                new_tweets.append(tweet_data)
+        if not new_tweets:
+            return
+
+        results = await asyncio.gather(*(self.build_insight(t) for t in new_tweets), return_exceptions=True)
+        insights = []
+        for tweet_data, insight in zip(new_tweets, results):
+            if isinstance(insight, BlockvisionUnavailable):
+                self.defer_tweet(tweet_data)
+            elif isinstance(insight, Exception):
+                print(f"Error processing tweet {tweet_data['tweet_id']}: {insight}")
+            elif insight:
+                insights.append(insight)
+            else:
+                print("⚠️ Failed to create insight from tweet")
+        if not insights:
+            return
+
+        if save_insights(insights):
+            for insight in insights:
+                self.seen_tweet_ids.add(insight['tweet_id'])
+        for insight in insights:
+            print("\nProcessed Insight:")
+            for key, value in insight.items():
+                print(f"{key}: {value}")
+        print("-" * 50)
+
+    def defer_tweet(self, tweet_data: dict) -> None:
+        """Queue a contract tweet for another enrichment attempt later."""
+        tweet_data['enrichment_attempts'] = tweet_data.get('enrichment_attempts', 0) + 1
+        self.deferred_tweets[tweet_data['tweet_id']] = tweet_data
+        if len(self.deferred_tweets) > MAX_DEFERRED_TWEETS:
+            _, dropped = self.deferred_tweets.popitem(last=False)
+            print(f"⚠️ Too many deferred tweets, dropping {dropped['tweet_id']}")
+        print(f"⏳ Tweet {tweet_data['tweet_id']} deferred, retrying enrichment in {ENRICHMENT_RETRY_SECONDS}s "
+              f"(attempt {tweet_data['enrichment_attempts']}/{MAX_ENRICHMENT_ATTEMPTS})")
+
+    async def retry_deferred_tweets(self) -> None:
+        """Periodically retry enriching tweets Blockvision could not handle earlier."""
+        while True:
+            await asyncio.sleep(ENRICHMENT_RETRY_SECONDS)
+            if not self.deferred_tweets:
+                continue
+            tweets = list(self.deferred_tweets.values())
+            self.deferred_tweets.clear()
+            try:
+                await self.handle_tweets(tweets)
+            except Exception as e:
+                print(f"Error retrying deferred tweets: {e}")
+                traceback.print_exc()
+
+    async def poll_account(self, account: AccountState, fetch_slots: asyncio.Semaphore) -> int:
+        """Fetch one account's timeline and process what is new; returns the number of new tweets."""
+        try:
+            async with fetch_slots:
+                tweets = await self.check_new_tweets(account)
+            if tweets:
+                await self.handle_tweets(tweets)
+            return len(tweets)
+        except Exception as e:
+            print(f"Error processing tweets for @{account.handle}: {e}")
+            traceback.print_exc()
+            return 0
+
+    async def watch_account(self, account: AccountState, fetch_slots: asyncio.Semaphore) -> None:
+        """Poll one account forever on its adaptive schedule, within the global budget."""
+        while True:
+            await asyncio.sleep(max(0.0, account.next_poll_at - time.monotonic()))
+            await self.budget.acquire()
+            # The first poll only records the timeline; it says nothing about activity
+            first_poll = not account.timeline_ids
+            new_tweets = await self.poll_account(account, fetch_slots)
+            if account.failures:
+                continue
+            account.schedule(new_tweets > 0 and not first_poll, self.check_interval)
+            print(f"@{account.handle}: next check in {account.interval:.0f}s")
+
+    async def run(self, check_interval: float, duration: Optional[float] = None) -> None:
+        """Watch every account concurrently, starting from check_interval; runs forever unless duration is given."""
+        self.check_interval = check_interval
+        fetch_slots = asyncio.Semaphore(MAX_CONCURRENT_FETCHES)
+        self.session = aiohttp.ClientSession(
+            headers=self.headers,
+            timeout=aiohttp.ClientTimeout(total=10),
+            connector=aiohttp.TCPConnector(limit=MAX_CONCURRENT_FETCHES),
+        )
+        # Spread the first polls out instead of firing every account at once
+        now = time.monotonic()
+        for account in self.accounts.values():
+            account.interval = check_interval
+            account.next_poll_at = now + random.uniform(0, check_interval * POLL_JITTER)
+        watchers = [asyncio.create_task(self.watch_account(account, fetch_slots)) for account in self.accounts.values()]
+        retry_task = asyncio.create_task(self.retry_deferred_tweets())
+        try:
+            await asyncio.wait(watchers, timeout=duration)
+        finally:
+            for task in watchers + [retry_task]:
+                task.cancel()
+            await asyncio.gather(*watchers, retry_task, return_exceptions=True)
+            if self.deferred_tweets:
+                print(f"⚠️ {len(self.deferred_tweets)} tweet(s) still waiting for Blockvision were not stored")
+            print(f"Nitter fetch stats: {self.stats}")
+            print("Poll intervals: " + ", ".join(
+                f"@{account.handle} {account.interval:.0f}s" for account in self.accounts.values()
+            ))
+            await self.session.close()
+            await self.blockvision.close()
+
+    def monitor(self, check_interval: float = 30, duration: Optional[float] = None) -> None:
+        """Monitor tweets from all accounts until stopped, or for duration seconds if given."""
+        print(f"\nStarting Nitter monitor for {len(self.accounts)} account(s): "
+              f"{', '.join('@' + handle for handle in self.accounts)}")
+        print(f"Polling every {MIN_POLL_INTERVAL:.0f}-{MAX_POLL_INTERVAL:.0f}s per account, starting at "
+              f"{check_interval}s, within {REQUESTS_PER_MINUTE:.0f} requests/minute")
+        if duration is not None:
+            print(f"Will stop after {duration} seconds")
         print("Waiting for new tweets...")
         print("-" * 50)
-        
-        start_time = time.time()
-        last_check_time = 0
-        
+
         try:
-            while time.time() - start_time < duration:
-                current_time = time.time()
-                
-                # Ensure minimum interval between checks
-                if current_time - last_check_time < check_interval:
-                    time.sleep(1)
-                    continue
-                    
-                tweet_data = self.check_new_tweets()
-                last_check_time = current_time
-                
-                if tweet_data:
-                    print("\n🔥 New tweet detected!")
-                    print(f"Time: {tweet_data['created_at']}")
-                    print(f"Text: {tweet_data['text']}")
-                    
-                    try:
-                        if tweet_data['contract_address']:
-                            print(f"✨ Contract found: {tweet_data['contract_address']}")
-                            insight = self.process_contract_tweet(tweet_data)
-                        else:
-                            print("ℹ️ No contract address found - processing as market insight")
-                            insight = self.process_non_contract_tweet(tweet_data)
-                            
-                        if insight:
-                            save_insight_to_json(insight)
-                            print("\nProcessed Insight:")
-                            for key, value in insight.items():
-                                print(f"{key}: {value}")
-                        else:
-                            print("⚠️ Failed to create insight from tweet")
-                            
-                    except Exception as e:
-                        print(f"Error processing tweet: {e}")
-                        traceback.print_exc()
-                        continue
-                        
-                    print("-" * 50)
-                    
-                remaining_time = duration - (time.time() - start_time)
-                if remaining_time > 0:
-                    sleep_time = min(check_interval, remaining_time)
-                    print(f"Next check in {sleep_time:.0f} seconds...")
-                    time.sleep(sleep_time)
-                    
+            asyncio.run(self.run(check_interval, duration))
             print("\nMonitoring session completed successfully")
-            
         except KeyboardInterrupt:
             print("\nMonitoring stopped by user")
         except Exception as e:
@@ -377,7 +556,6 @@ class NitterMonitor:
         finally:
             print("\nMonitoring session ended")
 
-
 if __name__ == "__main__":
     monitor = NitterMonitor()
-    monitor.monitor(check_interval=30, duration=3000)
\ No newline at end of file
+    monitor.monitor(check_interval=30)
\ No newline at end of file
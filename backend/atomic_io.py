@@ -0,0 +1,46 @@
+import os
+import tempfile
+from contextlib import contextmanager
+from typing import Iterator
+
+try:
+    import fcntl
+except ImportError:  # Windows: advisory locks are not available
+    fcntl = None
+
+# Helpers for files shared between the scanner processes and the API server.
+
+def atomic_write_text(path: str, text: str) -> None:
+    """Replace path with text so concurrent readers see either the old or the new file, never a partial one."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+@contextmanager
+def exclusive_lock(lock_path: str) -> Iterator[None]:
+    """Hold an advisory exclusive lock on lock_path across processes.
+
+    The lock lives on a sidecar file rather than the data file, because
+    atomic_write_text swaps the data file's inode and would orphan a lock
+    taken on it. Without fcntl this only yields.
+    """
+    if fcntl is None:
+        yield
+        return
+    with open(lock_path, "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
@@ -0,0 +1,123 @@
+"""Benchmark the Nitter timeline parsers on saved profile pages.
+
+Usage:
+    python bench_nitter_parser.py [PAGE_OR_DIR ...] [--repeat N]
+    python bench_nitter_parser.py [PAGE_OR_DIR ...] --check
+    python bench_nitter_parser.py --save HANDLE [HANDLE ...]
+
+Without paths, every .html file in fixtures/nitter/ is used. --save fetches
+the given profiles from NITTER_BASE_URL (default https://nitter.net) into
+that directory first.
+
+For each installed parser this prints the mean and best parse time per page,
+the peak Python heap allocated while parsing (tracemalloc; memory allocated
+inside libxml2 or lexbor is not counted) and whether its output matches the
+bs4 reference parser. --check skips the timing and only compares every
+parser's output with bs4 page by page, exiting non-zero on any mismatch.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+import requests
+
+from nitter_parser import PARSERS
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURES_DIR = os.path.join(BASE_DIR, "fixtures", "nitter")
+HEADERS = {
+    'User-Agent': (
+        'Mozilla/5.0 (Windows NT 10.0; Win64; x64) '
+        'AppleWebKit/537.36 (KHTML, like Gecko) '
+        'Chrome/120.0.0.0 Safari/537.36'
+    ),
+}
+
+def save_pages(handles):
+    base_url = os.getenv("NITTER_BASE_URL", "https://nitter.net")
+    os.makedirs(FIXTURES_DIR, exist_ok=True)
+    for handle in handles:
+        response = requests.get(f"{base_url}/{handle}", headers=HEADERS, timeout=10)
+        response.raise_for_status()
+        path = os.path.join(FIXTURES_DIR, f"{handle}.html")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(response.text)
+        print(f"Saved {path} ({len(response.text)} bytes)")
+
+def load_pages(paths):
+    files = []
+    if not paths:
+        paths = [FIXTURES_DIR] if os.path.isdir(FIXTURES_DIR) else []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(
+                os.path.join(path, name) for name in os.listdir(path) if name.endswith(".html")
+            ))
+        else:
+            files.append(path)
+    pages = {}
+    for path in files:
+        with open(path, "r", encoding="utf-8") as f:
+            pages[path] = f.read()
+    return pages
+
+def bench(parse, pages, repeat):
+    times = []
+    for _ in range(repeat):
+        for html in pages.values():
+            start = time.perf_counter()
+            parse(html)
+            times.append(time.perf_counter() - start)
+
+    peak = 0
+    for html in pages.values():
+        tracemalloc.start()
+        parse(html)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return statistics.mean(times), min(times), peak
+
+def check(pages, reference):
+    mismatches = 0
+    for name, parse in PARSERS.items():
+        for path, html in pages.items():
+            if parse(html) != reference[path]:
+                mismatches += 1
+                print(f"❌ {name} differs from bs4 on {path}")
+    print(f"{len(PARSERS)} parser(s) x {len(pages)} page(s): {mismatches} mismatch(es)")
+    return mismatches == 0
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Nitter timeline parsers")
+    parser.add_argument("paths", nargs="*", help="saved Nitter pages or directories of them")
+    parser.add_argument("--repeat", type=int, default=20, help="parses of each page per parser")
+    parser.add_argument("--check", action="store_true", help="only check that every parser matches bs4")
+    parser.add_argument("--save", nargs="+", metavar="HANDLE", help="fetch these profiles into the fixtures directory")
+    args = parser.parse_args()
+
+    if args.save:
+        save_pages(args.save)
+    pages = load_pages(args.paths)
+    if not pages:
+        parser.error(f"no saved pages found; pass paths or use --save to fetch some into {FIXTURES_DIR}")
+
+    reference = {path: PARSERS["bs4"](html) for path, html in pages.items()}
+    if args.check:
+        sys.exit(0 if check(pages, reference) else 1)
+
+    total_bytes = sum(len(html) for html in pages.values())
+    print(f"{len(pages)} page(s), {total_bytes / 1024:.0f} KiB, {args.repeat} run(s) each\n")
+
+    print(f"{'parser':<12}{'mean ms':>10}{'best ms':>10}{'peak KiB':>10}{'speedup':>9}  matches bs4")
+    baseline = None
+    for name, parse in PARSERS.items():
+        mean, best, peak = bench(parse, pages, args.repeat)
+        baseline = baseline or mean
+        matches = all(parse(html) == reference[path] for path, html in pages.items())
+        print(f"{name:<12}{mean * 1000:>10.2f}{best * 1000:>10.2f}{peak / 1024:>10.0f}{baseline / mean:>8.1f}x  {'yes' if matches else 'NO'}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,399 @@
+import asyncio
+import os
+import random
+import time
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+import aiohttp
+
+# API configurations for Blockvision
+BLOCKVISION_API_URL = "https://api.blockvision.org/v2/sui/coin/detail"
+BLOCKVISION_HOLDERS_API_URL = "https://api.blockvision.org/v2/sui/coin/holders"
+
+# Freshness windows (seconds). Price fields go stale quickly; name, symbol,
+# supply and verified flag barely change, so they can outlive a failed refresh.
+PRICE_TTL = 30
+METADATA_TTL = 3600
+HOLDERS_TTL = 120
+CACHE_MAX_ENTRIES = 1000
+# coin/detail fields that are only as fresh as PRICE_TTL
+PRICE_FIELDS = ("price", "priceChangePercentage24H", "marketCap", "holders")
+# Cached in place of a response when Blockvision does not support the coin
+_UNSUPPORTED = object()
+
+# Retry policy for 429s, 5xx responses and network errors
+MAX_RETRIES = 3
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 30.0
+# Consecutive failed requests before the circuit opens, and how long it stays open
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_RESET_TIMEOUT = 60.0
+# Processes sharing one API key (see start.sh); each gets an equal share of
+# BLOCKVISION_RATE_LIMIT unless BLOCKVISION_RATE_LIMIT_<SCOPE> sets its own.
+RATE_LIMIT_SCOPES = ("tg", "x")
+
+class BlockvisionUnavailable(Exception):
+    """Blockvision is throttling us or failing, as opposed to not knowing the coin."""
+
+    def __init__(self, message: str, throttled: bool = False):
+        super().__init__(message)
+        self.throttled = throttled
+
+class TokenBucket:
+    """Async token bucket allowing `rate` requests per second with bursts up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every caller for `seconds`, e.g. to honour a Retry-After."""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    async def acquire(self) -> None:
+        while True:
+            now = time.monotonic()
+            if now < self.paused_until:
+                await asyncio.sleep(self.paused_until - now)
+                continue
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+class CircuitBreaker:
+    """Stops calling a failing API for a while instead of queueing more retries.
+
+    Opens after `failure_threshold` consecutive failures. Once `reset_timeout`
+    has passed a single trial request is let through; success closes the
+    circuit again, failure keeps it open for another `reset_timeout`.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_at: Optional[float] = None
+
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None
+
+    def allow(self) -> bool:
+        if self.opened_at is None:
+            return True
+        now = time.monotonic()
+        if now - self.opened_at < self.reset_timeout:
+            return False
+        # Only one trial at a time; a trial that never reported back is retried after reset_timeout
+        if self.trial_at is not None and now - self.trial_at < self.reset_timeout:
+            return False
+        self.trial_at = now
+        return True
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self.trial_at = None
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self.trial_at = None
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+def retry_after_seconds(response: aiohttp.ClientResponse) -> Optional[float]:
+    """Parse a Retry-After header given either in seconds or as an HTTP date."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def scoped_rate_limit(scope: Optional[str]) -> float:
+    """Requests per second allowed to one process using the shared API key."""
+    total = float(os.getenv("BLOCKVISION_RATE_LIMIT", "10"))
+    if not scope:
+        return total
+    scoped = os.getenv(f"BLOCKVISION_RATE_LIMIT_{scope.upper()}")
+    if scoped:
+        return float(scoped)
+    return total / len(RATE_LIMIT_SCOPES)
+
+def backoff_delay(attempt: int) -> float:
+    """Exponential backoff with full jitter."""
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+class TTLCache:
+    """LRU cache whose entries are checked against a max age chosen at lookup time."""
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def get(self, key: str, max_age: float) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None or time.monotonic() - entry[0] > max_age:
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def set(self, key: str, value: Any) -> None:
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+class BlockvisionClient:
+    """Async Blockvision API client shared by both scanners.
+
+    All requests go through one long-lived aiohttp session, so TCP and TLS
+    connections are pooled and kept alive between contracts. The session is
+    created on first use and bound to the running event loop. Settings
+    default to the BLOCKVISION_* environment variables, read when the
+    client is created so a .env loaded by the caller is honoured.
+
+    Responses are cached per coin type. A detail response is reused for
+    PRICE_TTL; after that it is refetched, and if the refetch fails its
+    metadata (everything but PRICE_FIELDS) is still served up to METADATA_TTL.
+    A non-retryable error (the coin is not supported) is cached too, for
+    PRICE_TTL or HOLDERS_TTL, so a coin mentioned over and over is not
+    re-requested every time. Concurrent cache misses for the same request share one in-flight call.
+
+    Requests pass through a token bucket shared by every caller of the
+    client. BLOCKVISION_RATE_LIMIT is the quota of the whole API key; the
+    scanners run as separate processes, so a client created with a `scope`
+    ("tg" or "x") only gets its share of it (see scoped_rate_limit). A
+    Retry-After pause only holds back this process; the other one backs
+    off on its own 429s. 429s, 5xx responses and network
+    errors are retried with jittered exponential backoff, honouring
+    Retry-After; when retries run out BlockvisionUnavailable is raised, and
+    repeated failures open a circuit breaker that fails fast for a while.
+    Counters for throttled, retried and failed calls are kept in `stats`.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        timeout: Optional[float] = None,
+        connect_timeout: Optional[float] = None,
+        max_connections: Optional[int] = None,
+        enrichment_timeout: Optional[float] = None,
+        rate_limit: Optional[float] = None,
+        scope: Optional[str] = None,
+    ):
+        self.api_key = api_key or os.getenv("BLOCKVISION_API_KEY")
+        self.timeout = timeout or float(os.getenv("BLOCKVISION_TIMEOUT", "10"))
+        self.connect_timeout = connect_timeout or float(os.getenv("BLOCKVISION_CONNECT_TIMEOUT", "5"))
+        self.max_connections = max_connections or int(os.getenv("BLOCKVISION_MAX_CONNECTIONS", "10"))
+        self._session: Optional[aiohttp.ClientSession] = None
+        self.price_ttl = PRICE_TTL
+        self.metadata_ttl = METADATA_TTL
+        self.holders_ttl = HOLDERS_TTL
+        self._detail_cache = TTLCache()
+        self._holders_cache = TTLCache()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.rate_limit = rate_limit or scoped_rate_limit(scope)
+        self.max_retries = MAX_RETRIES
+        self.enrichment_timeout = enrichment_timeout or float(
+            os.getenv("BLOCKVISION_ENRICHMENT_TIMEOUT") or self.retry_budget()
+        )
+        self.rate_limiter = TokenBucket(self.rate_limit, max(1.0, self.rate_limit))
+        self.breaker = CircuitBreaker(BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_TIMEOUT)
+        self.stats = {"requests": 0, "throttled": 0, "retried": 0, "failed": 0, "short_circuited": 0}
+
+    def retry_budget(self) -> float:
+        """Longest a request can take through all its retries, unless Retry-After asks for longer."""
+        backoff = sum(min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt) + BACKOFF_BASE for attempt in range(self.max_retries))
+        return (self.max_retries + 1) * self.timeout + backoff
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self.max_connections,
+                    keepalive_timeout=60,
+                    ttl_dns_cache=300,
+                ),
+                timeout=aiohttp.ClientTimeout(total=self.timeout, connect=self.connect_timeout),
+                headers={"accept": "application/json", "x-api-key": self.api_key or ""},
+            )
+        return self._session
+
+    async def _get_result(self, url: str, label: str) -> Optional[Dict]:
+        """GET a Blockvision endpoint and return its "result" payload.
+
+        Returns None when Blockvision answers with a non-retryable error
+        (the coin is not supported); raises BlockvisionUnavailable when it
+        is throttling or failing.
+        """
+        if not self.breaker.allow():
+            self.stats["short_circuited"] += 1
+            raise BlockvisionUnavailable(f"{label} circuit open after repeated failures")
+
+        throttled = False
+        for attempt in range(self.max_retries + 1):
+            await self.rate_limiter.acquire()
+            self.stats["requests"] += 1
+            retry_after = None
+            try:
+                async with self._get_session().get(url) as response:
+                    if response.status == 200:
+                        data = await response.json()
+                        print(f"{label} Response:", data)
+                        self.breaker.record_success()
+                        return data.get("result") or {}
+                    if response.status == 429:
+                        throttled = True
+                        self.stats["throttled"] += 1
+                        retry_after = retry_after_seconds(response)
+                        self.rate_limiter.pause(retry_after if retry_after is not None else backoff_delay(attempt))
+                        print(f"⚠️ {label} throttled (429), retry after {retry_after}")
+                    elif response.status >= 500:
+                        throttled = False
+                        print(f"Failed to fetch {label} data: {response.status}")
+                    else:
+                        print(f"Failed to fetch {label} data: {response.status}")
+                        self.breaker.record_success()
+                        return None
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                throttled = False
+                print(f"Error fetching {label} data: {e!r}")
+
+            if attempt < self.max_retries:
+                self.stats["retried"] += 1
+                delay = retry_after if retry_after is not None else backoff_delay(attempt)
+                await asyncio.sleep(delay + random.uniform(0, BACKOFF_BASE))
+
+        self.stats["failed"] += 1
+        self.breaker.record_failure()
+        if self.breaker.is_open:
+            print(f"⚠️ Blockvision circuit open for {BREAKER_RESET_TIMEOUT:.0f}s")
+        raise BlockvisionUnavailable(f"{label} unavailable after {self.max_retries} retries", throttled=throttled)
+
+    async def _single_flight(self, key: str, load: Callable[[], Awaitable[Any]]) -> Any:
+        """Run load() once for all concurrent callers with the same key.
+
+        The shared call is shielded, so a caller being cancelled does not
+        cancel the request for everyone else.
+        """
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(load())
+            self._inflight[key] = future
+            future.add_done_callback(lambda done: self._finish_flight(key, done))
+        return await asyncio.shield(future)
+
+    def _finish_flight(self, key: str, future: asyncio.Future) -> None:
+        self._inflight.pop(key, None)
+        # Mark the error as retrieved even if every waiter was cancelled
+        if not future.cancelled():
+            future.exception()
+
+    def _stale_detail(self, coin_type: str) -> Optional[Dict]:
+        stale = self._detail_cache.get(coin_type, self.metadata_ttl)
+        return None if stale is None or stale is _UNSUPPORTED else stale
+
+    async def _load_coin_detail(self, coin_type: str) -> Optional[Dict]:
+        url = f"{BLOCKVISION_API_URL}?coinType={quote(coin_type, safe='')}"
+        try:
+            result = await self._get_result(url, "Blockvision API")
+        except BlockvisionUnavailable:
+            result = None
+            if self._stale_detail(coin_type) is None:
+                raise
+        if result is not None:
+            self._detail_cache.set(coin_type, result)
+            return result
+
+        stale = self._stale_detail(coin_type)
+        if stale is not None:
+            print(f"Using cached Blockvision metadata for {coin_type}")
+            return {key: value for key, value in stale.items() if key not in PRICE_FIELDS}
+        self._detail_cache.set(coin_type, _UNSUPPORTED)
+        return None
+
+    async def fetch_coin_detail(self, coin_type: str) -> Optional[Dict]:
+        """Fetch coin data from the Blockvision coin/detail endpoint, through the cache."""
+        result = self._detail_cache.get(coin_type, self.price_ttl)
+        if result is _UNSUPPORTED:
+            return None
+        if result is None:
+            result = await self._single_flight(f"detail|{coin_type}", lambda: self._load_coin_detail(coin_type))
+        return None if result is None else dict(result)
+
+    async def _load_coin_holders(self, coin_type: str, page_index: int, page_size: int, cache_key: str) -> Optional[List[Dict]]:
+        url = (
+            f"{BLOCKVISION_HOLDERS_API_URL}?coinType={quote(coin_type, safe='')}"
+            f"&pageIndex={page_index}&pageSize={page_size}"
+        )
+        result = await self._get_result(url, "Blockvision Holders API")
+        if result is None:
+            self._holders_cache.set(cache_key, _UNSUPPORTED)
+            return None
+        holders = result.get("data", [])
+        self._holders_cache.set(cache_key, holders)
+        return holders
+
+    async def fetch_coin_holders(self, coin_type: str, page_index: int = 1, page_size: int = 10) -> Optional[List[Dict]]:
+        """Fetch coin holders data from the Blockvision coin/holders endpoint, through the cache."""
+        cache_key = f"{coin_type}|{page_index}|{page_size}"
+        holders = self._holders_cache.get(cache_key, self.holders_ttl)
+        if holders is _UNSUPPORTED:
+            return None
+        if holders is None:
+            holders = await self._single_flight(
+                f"holders|{cache_key}",
+                lambda: self._load_coin_holders(coin_type, page_index, page_size, cache_key),
+            )
+        return None if holders is None else list(holders)
+
+    async def fetch_coin_snapshot(self, coin_type: str) -> Tuple[Optional[Dict], Optional[List[Dict]]]:
+        """Fetch coin detail and top holders concurrently.
+
+        Waits at most enrichment_timeout, by default the full retry budget.
+        Holders that have not arrived by then are returned as None, so the
+        insight is built without them. A detail call that is still running,
+        throttled or failed raises BlockvisionUnavailable: the coin may well
+        be supported, Blockvision just did not answer in time. Timed-out
+        calls keep running in the background and fill the cache for the
+        next lookup.
+        """
+        detail_task = asyncio.ensure_future(self.fetch_coin_detail(coin_type))
+        holders_task = asyncio.ensure_future(self.fetch_coin_holders(coin_type))
+        done, pending = await asyncio.wait({detail_task, holders_task}, timeout=self.enrichment_timeout)
+        for task in pending:
+            task.cancel()
+        holders = None
+        if holders_task in done:
+            try:
+                holders = holders_task.result()
+            except BlockvisionUnavailable as e:
+                print(f"Blockvision holders unavailable for {coin_type}: {e}")
+        elif detail_task in done:
+            print(f"Blockvision holders for {coin_type} timed out after {self.enrichment_timeout:g}s, using partial data")
+        if detail_task in pending:
+            raise BlockvisionUnavailable(f"Blockvision detail for {coin_type} timed out after {self.enrichment_timeout:g}s")
+        return detail_task.result(), holders
+
+    async def close(self) -> None:
+        print(f"Blockvision client stats: {self.stats}")
+        for future in list(self._inflight.values()):
+            future.cancel()
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
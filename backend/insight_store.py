@@ -0,0 +1,457 @@
+import bisect
+import json
+import os
+import sqlite3
+import threading
+import traceback
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+from atomic_io import atomic_write_text, exclusive_lock
+
+# Shared insight storage for the scanners and the API server.
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_INSIGHTS_DB_FILE = os.path.join(BASE_DIR, "insights.db")
+DEFAULT_INSIGHTS_LOG_FILE = os.path.join(BASE_DIR, "insights.jsonl")
+
+# The JSONL log is compacted once this share of its lines are deleted records or
+# tombstones; the SQLite store prunes its tombstones at the same share of rows.
+COMPACT_DEAD_RATIO = 0.3
+COMPACT_MIN_LINES = 1000
+
+# Whole-file JSON arrays used before the SQLite store; imported once on first start.
+LEGACY_TELEGRAM_FILE = os.path.join(BASE_DIR, "telegram_insights.json")
+LEGACY_MARKET_FILE = os.path.join(BASE_DIR, "market_insights.json")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS insights (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    seq INTEGER NOT NULL,
+    source TEXT NOT NULL,
+    contract TEXT,
+    tweet_id TEXT,
+    timestamp TEXT,
+    deleted INTEGER NOT NULL DEFAULT 0,
+    data TEXT NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_insights_seq ON insights (seq);
+CREATE INDEX IF NOT EXISTS idx_insights_contract ON insights (contract);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_insights_tweet_id ON insights (tweet_id)
+    WHERE tweet_id IS NOT NULL AND deleted = 0;
+CREATE INDEX IF NOT EXISTS idx_insights_source ON insights (source);
+CREATE INDEX IF NOT EXISTS idx_insights_timestamp ON insights (timestamp);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+def read_legacy_insights() -> List[Dict]:
+    """Return the insights of the old JSON files, oldest first within each file."""
+    insights = []
+    # The telegram file is oldest-first; the market file is newest-first.
+    for file_path, newest_first in ((LEGACY_TELEGRAM_FILE, False), (LEGACY_MARKET_FILE, True)):
+        try:
+            with open(file_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            continue
+        except Exception as e:
+            print(f"Error reading legacy insights from {file_path}: {e}")
+            traceback.print_exc()
+            continue
+        if isinstance(data, list):
+            data = [insight for insight in data if isinstance(insight, dict)]
+            for insight in data:
+                # Older X scanners kept Nitter's "#m" link suffix in tweet ids.
+                if isinstance(insight.get("tweet_id"), str):
+                    insight["tweet_id"] = insight["tweet_id"].split("#")[0]
+            insights.extend(reversed(data) if newest_first else data)
+    return insights
+
+def open_insight_store():
+    """Open the insight store selected by the environment.
+
+    INSIGHT_STORE is "sqlite" (default) or "jsonl" for deployments that want
+    to stay file-based; INSIGHTS_DB and INSIGHTS_LOG override the file paths.
+    Read at call time so a .env loaded by the caller is honoured.
+    """
+    if os.getenv("INSIGHT_STORE", "sqlite") == "jsonl":
+        return JsonlInsightStore(os.getenv("INSIGHTS_LOG", DEFAULT_INSIGHTS_LOG_FILE))
+    return SQLiteInsightStore(os.getenv("INSIGHTS_DB", DEFAULT_INSIGHTS_DB_FILE))
+
+class SQLiteInsightStore:
+    """SQLite (WAL mode) store shared by the scanner processes and the API server.
+
+    Every insert and delete takes the next value of a store-wide sequence
+    number. Deletes are soft: the row is flagged, re-sequenced and its data
+    cleared, so readers can pull everything that changed after the last
+    sequence number they saw. compact() prunes the tombstones once enough
+    rows are deleted and records how far it went in compacted_seq().
+    """
+
+    def __init__(self, path: str = DEFAULT_INSIGHTS_DB_FILE):
+        self.path = path
+        self._local = threading.local()
+        conn = self._connect()
+        conn.executescript(SCHEMA)
+        self._import_legacy_json()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _write(self) -> Iterator[sqlite3.Connection]:
+        """Run a write transaction holding the database write lock from the start."""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        else:
+            conn.execute("COMMIT")
+
+    @staticmethod
+    def _next_seq(conn: sqlite3.Connection) -> int:
+        return conn.execute("SELECT COALESCE(MAX(seq), 0) + 1 FROM insights").fetchone()[0]
+
+    @staticmethod
+    def _insert(conn: sqlite3.Connection, insight: Dict) -> bool:
+        tweet_id = insight.get("tweet_id")
+        cursor = conn.execute(
+            "INSERT OR IGNORE INTO insights (seq, source, contract, tweet_id, timestamp, data) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                SQLiteInsightStore._next_seq(conn),
+                insight.get("source", "unknown"),
+                insight.get("contract"),
+                str(tweet_id) if tweet_id is not None else None,
+                insight.get("timestamp"),
+                json.dumps(insight, ensure_ascii=False),
+            ),
+        )
+        return cursor.rowcount == 1
+
+    def add(self, insight: Dict) -> bool:
+        """Insert one insight. Returns False if its tweet_id is already stored."""
+        with self._write() as conn:
+            return self._insert(conn, insight)
+
+    def add_many(self, insights: List[Dict]) -> List[bool]:
+        """Insert several insights in one transaction; returns add()'s result for each."""
+        with self._write() as conn:
+            return [self._insert(conn, insight) for insight in insights]
+
+    def delete(self, identifier: str) -> int:
+        """Soft-delete every live insight whose contract or tweet_id matches; returns the count."""
+        with self._write() as conn:
+            ids = [
+                row["id"] for row in conn.execute(
+                    "SELECT id FROM insights WHERE deleted = 0 AND contract = ? "
+                    "UNION SELECT id FROM insights WHERE deleted = 0 AND tweet_id = ?",
+                    (identifier, identifier),
+                )
+            ]
+            for row_id in ids:
+                conn.execute(
+                    "UPDATE insights SET deleted = 1, seq = ?, data = 'null' WHERE id = ?",
+                    (self._next_seq(conn), row_id),
+                )
+            return len(ids)
+
+    def changes_since(self, since: int, limit: Optional[int] = None) -> List[Dict]:
+        """Return rows inserted or deleted after sequence number since, oldest change first."""
+        query = (
+            "SELECT id, seq, source, contract, tweet_id, deleted, data FROM insights "
+            "WHERE seq > ? ORDER BY seq"
+        )
+        params = [since]
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        return [
+            {
+                "id": row["id"],
+                "seq": row["seq"],
+                "source": row["source"],
+                "contract": row["contract"],
+                "tweet_id": row["tweet_id"],
+                "deleted": bool(row["deleted"]),
+                "insight": None if row["deleted"] else json.loads(row["data"]),
+            }
+            for row in self._connect().execute(query, params)
+        ]
+
+    def live_tweet_ids(self) -> List[str]:
+        """Return the tweet_id of every stored, non-deleted insight, oldest first."""
+        return [
+            row["tweet_id"] for row in self._connect().execute(
+                "SELECT tweet_id FROM insights WHERE tweet_id IS NOT NULL AND deleted = 0 ORDER BY id"
+            )
+        ]
+
+    def last_seq(self) -> int:
+        return self._connect().execute("SELECT COALESCE(MAX(seq), 0) FROM insights").fetchone()[0]
+
+    def compacted_seq(self) -> int:
+        """Changes at or before this sequence number may have lost their tombstones."""
+        row = self._connect().execute("SELECT value FROM meta WHERE key = 'compacted_seq'").fetchone()
+        return int(row["value"]) if row else 0
+
+    def compact(self) -> bool:
+        """Drop tombstones once enough rows are deleted; returns True if any were pruned."""
+        with self._write() as conn:
+            total, dead = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(deleted), 0) FROM insights"
+            ).fetchone()
+            if dead < COMPACT_MIN_LINES or dead < total * COMPACT_DEAD_RATIO:
+                return False
+            # The newest row is kept even if it is a tombstone, so sequence numbers are never reused.
+            last_seq = self._next_seq(conn) - 1
+            pruned_seq = conn.execute(
+                "SELECT MAX(seq) FROM insights WHERE deleted = 1 AND seq < ?", (last_seq,)
+            ).fetchone()[0]
+            if pruned_seq is None:
+                return False
+            pruned = conn.execute(
+                "DELETE FROM insights WHERE deleted = 1 AND seq <= ?", (pruned_seq,)
+            ).rowcount
+            conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('compacted_seq', ?)", (str(pruned_seq),)
+            )
+        print(f"Compacted {self.path}: pruned {pruned} tombstones up to seq {pruned_seq}")
+        return True
+
+    def _import_legacy_json(self) -> None:
+        """Copy the old JSON insight files into the store the first time it is opened."""
+        with self._write() as conn:
+            if conn.execute("SELECT 1 FROM meta WHERE key = 'legacy_json_imported'").fetchone():
+                return
+            imported = 0
+            for insight in read_legacy_insights():
+                if self._insert(conn, insight):
+                    imported += 1
+            conn.execute("INSERT INTO meta (key, value) VALUES ('legacy_json_imported', ?)", (str(imported),))
+        if imported:
+            print(f"Imported {imported} legacy insights into {self.path}")
+
+class JsonlInsightStore:
+    """Append-only newline-delimited insight log, for deployments that stay file-based.
+
+    Each line is one operation: {"op": "add"} with the insight, {"op": "del"}
+    naming the id it deletes, or a {"op": "compacted"} header. Every process
+    tails the log by byte offset and keeps the replayed rows in memory, so
+    reads never re-parse the whole file. Appends hold an exclusive lock so
+    sequence numbers stay unique across the scanner and server processes.
+
+    compact() rewrites the log without deleted records once enough of it is
+    dead. Tombstones older than the rewrite are gone, so compacted_seq()
+    tells incremental readers when they must reset.
+    """
+
+    def __init__(self, path: str = DEFAULT_INSIGHTS_LOG_FILE):
+        self.path = path
+        self._lock_path = path + ".lock"
+        self._thread_lock = threading.RLock()
+        self._reset_state()
+        with self._locked():
+            if not os.path.exists(self.path):
+                self._create_log()
+
+    def _reset_state(self) -> None:
+        self._inode = None
+        self._offset = 0
+        self._rows: Dict[int, Dict] = {}
+        self._seqs: List[int] = []
+        self._ids: List[int] = []
+        self._live_tweet_ids: Dict[str, int] = {}
+        self._last_seq = 0
+        self._compacted_seq = 0
+        self._lines = 0
+        self._live = 0
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Hold the in-process lock and the cross-process lock on the sidecar lock file."""
+        with self._thread_lock, exclusive_lock(self._lock_path):
+            yield
+
+    def _create_log(self) -> None:
+        lines = [{"op": "compacted", "seq": 0}]
+        for seq, insight in enumerate(read_legacy_insights(), start=1):
+            lines.append({"op": "add", "seq": seq, "id": seq, "insight": insight})
+        atomic_write_text(self.path, "".join(json.dumps(line, ensure_ascii=False) + "\n" for line in lines))
+        if len(lines) > 1:
+            print(f"Imported {len(lines) - 1} legacy insights into {self.path}")
+
+    def _apply(self, op: Dict) -> None:
+        self._lines += 1
+        kind = op.get("op")
+        if kind == "compacted":
+            self._compacted_seq = op["seq"]
+            self._last_seq = max(self._last_seq, op["seq"])
+            return
+        if kind == "add":
+            insight = op["insight"]
+            tweet_id = insight.get("tweet_id")
+            row = {
+                "id": op["id"],
+                "seq": op["seq"],
+                "source": insight.get("source", "unknown"),
+                "contract": insight.get("contract"),
+                "tweet_id": str(tweet_id) if tweet_id is not None else None,
+                "deleted": False,
+                "insight": insight,
+            }
+            self._live += 1
+            if row["tweet_id"] is not None:
+                self._live_tweet_ids[row["tweet_id"]] = row["id"]
+        elif kind == "del":
+            row = self._rows.get(op["id"])
+            if row is None or row["deleted"]:
+                return
+            row = dict(row, seq=op["seq"], deleted=True, insight=None)
+            self._live -= 1
+            if row["tweet_id"] is not None:
+                self._live_tweet_ids.pop(row["tweet_id"], None)
+        else:
+            return
+        self._rows[row["id"]] = row
+        self._seqs.append(row["seq"])
+        self._ids.append(row["id"])
+        self._last_seq = max(self._last_seq, row["seq"])
+
+    def _catch_up(self) -> None:
+        """Apply complete lines appended since the last read; start over if the log was replaced."""
+        with self._thread_lock:
+            try:
+                f = open(self.path, "rb")
+            except FileNotFoundError:
+                return
+            with f:
+                st = os.fstat(f.fileno())
+                if st.st_ino != self._inode or st.st_size < self._offset:
+                    self._reset_state()
+                    self._inode = st.st_ino
+                f.seek(self._offset)
+                data = f.read()
+            end = data.rfind(b"\n") + 1
+            for line in data[:end].splitlines():
+                if line.strip():
+                    self._apply(json.loads(line))
+            self._offset += end
+
+    def _append(self, ops: List[Dict]) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(op, ensure_ascii=False) + "\n" for op in ops))
+
+    def add(self, insight: Dict) -> bool:
+        """Append one insight. Returns False if its tweet_id is already stored."""
+        with self._locked():
+            self._catch_up()
+            tweet_id = insight.get("tweet_id")
+            if tweet_id is not None and str(tweet_id) in self._live_tweet_ids:
+                return False
+            seq = self._last_seq + 1
+            self._append([{"op": "add", "seq": seq, "id": seq, "insight": insight}])
+            self._catch_up()
+            return True
+
+    def add_many(self, insights: List[Dict]) -> List[bool]:
+        """Append several insights in one locked write; returns add()'s result for each."""
+        with self._locked():
+            self._catch_up()
+            ops = []
+            added = []
+            batch_tweet_ids = set()
+            for insight in insights:
+                tweet_id = insight.get("tweet_id")
+                if tweet_id is not None:
+                    tweet_id = str(tweet_id)
+                    if tweet_id in self._live_tweet_ids or tweet_id in batch_tweet_ids:
+                        added.append(False)
+                        continue
+                    batch_tweet_ids.add(tweet_id)
+                seq = self._last_seq + len(ops) + 1
+                ops.append({"op": "add", "seq": seq, "id": seq, "insight": insight})
+                added.append(True)
+            if ops:
+                self._append(ops)
+                self._catch_up()
+            return added
+
+    def delete(self, identifier: str) -> int:
+        """Append tombstones for every live insight whose contract or tweet_id matches; returns the count."""
+        with self._locked():
+            self._catch_up()
+            ids = [
+                row["id"] for row in self._rows.values()
+                if not row["deleted"] and identifier in (row["contract"], row["tweet_id"])
+            ]
+            ops = [
+                {"op": "del", "seq": self._last_seq + n, "id": row_id}
+                for n, row_id in enumerate(ids, start=1)
+            ]
+            if ops:
+                self._append(ops)
+                self._catch_up()
+            return len(ids)
+
+    def changes_since(self, since: int, limit: Optional[int] = None) -> List[Dict]:
+        """Return rows inserted or deleted after sequence number since, oldest change first."""
+        with self._thread_lock:
+            self._catch_up()
+            changes = []
+            for i in range(bisect.bisect_right(self._seqs, since), len(self._seqs)):
+                row = self._rows[self._ids[i]]
+                # An add entry is superseded once its row has been deleted.
+                if row["seq"] != self._seqs[i]:
+                    continue
+                changes.append(row)
+                if limit is not None and len(changes) >= limit:
+                    break
+            return changes
+
+    def live_tweet_ids(self) -> List[str]:
+        """Return the tweet_id of every stored, non-deleted insight, oldest first."""
+        with self._thread_lock:
+            self._catch_up()
+            return sorted(self._live_tweet_ids, key=self._live_tweet_ids.get)
+
+    def last_seq(self) -> int:
+        with self._thread_lock:
+            self._catch_up()
+            return self._last_seq
+
+    def compacted_seq(self) -> int:
+        """Changes at or before this sequence number may have lost their tombstones."""
+        with self._thread_lock:
+            self._catch_up()
+            return self._compacted_seq
+
+    def compact(self) -> bool:
+        """Rewrite the log without deleted records when enough of it is dead; returns True if rewritten."""
+        with self._locked():
+            self._catch_up()
+            if self._lines < COMPACT_MIN_LINES or self._live > self._lines * (1 - COMPACT_DEAD_RATIO):
+                return False
+            lines = [json.dumps({"op": "compacted", "seq": self._last_seq}) + "\n"]
+            for row in sorted(self._rows.values(), key=lambda r: r["seq"]):
+                if not row["deleted"]:
+                    op = {"op": "add", "seq": row["seq"], "id": row["id"], "insight": row["insight"]}
+                    lines.append(json.dumps(op, ensure_ascii=False) + "\n")
+            atomic_write_text(self.path, "".join(lines))
+            lines_before = self._lines
+            self._catch_up()
+            print(f"Compacted {self.path}: {lines_before} -> {self._lines} lines")
+            return True
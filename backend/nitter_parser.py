@@ -0,0 +1,126 @@
+import hashlib
+import os
+import re
+from typing import Callable, Dict, List, Optional
+
+from bs4 import BeautifulSoup
+
+try:
+    import lxml.html
+except ImportError:
+    lxml = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+# Nitter timeline parsing. Every backend returns the same list of raw
+# timeline items, in page order:
+#   {"tweet_id", "href", "text", "created_at", "pinned"}
+# where text is the tweet-content text joined like bs4's get_text(strip=True)
+# and created_at is the tweet-date link title, or None.
+
+_TWEET_LINK = re.compile(r'<a class="tweet-link" href="([^"]+)"')
+
+def timeline_fingerprint(html: str) -> Optional[str]:
+    """Hash of the tweet permalinks on a timeline page, without parsing it.
+
+    Relative dates and counters change between polls, the set of tweets
+    usually does not; equal fingerprints mean there is nothing new. Returns
+    None if no permalinks are found, e.g. after a markup change.
+    """
+    links = _TWEET_LINK.findall(html)
+    if not links:
+        return None
+    return hashlib.sha1("\n".join(links).encode("utf-8")).hexdigest()
+
+def _tweet_id(href: str) -> str:
+    return href.split('/')[-1].split('#')[0]
+
+def _item(href: str, text: str, created_at: Optional[str], pinned: bool) -> Dict:
+    return {
+        "tweet_id": _tweet_id(href),
+        "href": href,
+        "text": text,
+        "created_at": created_at,
+        "pinned": pinned,
+    }
+
+def parse_timeline_bs4(html: str) -> List[Dict]:
+    """Reference parser: full BeautifulSoup tree with the pure-Python html.parser."""
+    items = []
+    for tweet in BeautifulSoup(html, 'html.parser').find_all('div', class_='timeline-item'):
+        content = tweet.find('div', class_='tweet-content')
+        link = tweet.find('a', class_='tweet-link')
+        if not content or not link or not link.get('href'):
+            continue
+        date_tag = tweet.find('span', class_='tweet-date')
+        date_link = date_tag.find('a') if date_tag else None
+        items.append(_item(
+            link['href'],
+            content.get_text(strip=True),
+            date_link.get('title') if date_link else None,
+            tweet.find('div', class_='pinned') is not None,
+        ))
+    return items
+
+def _has_class(name: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+_LXML_ITEMS = f"//div[{_has_class('timeline-item')}]"
+_LXML_CONTENT = f".//div[{_has_class('tweet-content')}]"
+_LXML_LINK = f".//a[{_has_class('tweet-link')}][@href]"
+_LXML_DATE = f".//span[{_has_class('tweet-date')}]//a"
+_LXML_PINNED = f".//div[{_has_class('pinned')}]"
+
+def parse_timeline_lxml(html: str) -> List[Dict]:
+    """libxml2 parser; XPath picks out only the nodes a timeline item needs."""
+    items = []
+    for tweet in lxml.html.fromstring(html).xpath(_LXML_ITEMS):
+        content = tweet.xpath(_LXML_CONTENT)
+        link = tweet.xpath(_LXML_LINK)
+        if not content or not link:
+            continue
+        date_link = tweet.xpath(_LXML_DATE)
+        items.append(_item(
+            link[0].get('href'),
+            "".join(text.strip() for text in content[0].itertext()),
+            date_link[0].get('title') if date_link else None,
+            bool(tweet.xpath(_LXML_PINNED)),
+        ))
+    return items
+
+def parse_timeline_selectolax(html: str) -> List[Dict]:
+    """Lexbor parser via selectolax; fastest when installed."""
+    items = []
+    for tweet in LexborHTMLParser(html).css('div.timeline-item'):
+        content = tweet.css_first('div.tweet-content')
+        link = tweet.css_first('a.tweet-link')
+        if content is None or link is None or not link.attributes.get('href'):
+            continue
+        date_link = tweet.css_first('span.tweet-date a')
+        items.append(_item(
+            link.attributes['href'],
+            content.text(deep=True, separator='', strip=True),
+            date_link.attributes.get('title') if date_link is not None else None,
+            tweet.css_first('div.pinned') is not None,
+        ))
+    return items
+
+PARSERS: Dict[str, Callable[[str], List[Dict]]] = {"bs4": parse_timeline_bs4}
+if lxml is not None:
+    PARSERS["lxml"] = parse_timeline_lxml
+if LexborHTMLParser is not None:
+    PARSERS["selectolax"] = parse_timeline_selectolax
+
+def get_timeline_parser(name: Optional[str] = None) -> Callable[[str], List[Dict]]:
+    """Return the named parser, or NITTER_PARSER, or the fastest one installed."""
+    name = name or os.getenv("NITTER_PARSER")
+    if name:
+        if name not in PARSERS:
+            raise ValueError(f"❌ Nitter parser {name!r} is not available; choose from {', '.join(PARSERS)}")
+        return PARSERS[name]
+    for preferred in ("selectolax", "lxml", "bs4"):
+        if preferred in PARSERS:
+            return PARSERS[preferred]
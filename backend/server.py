@@ -1,14 +1,23 @@
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+import asyncio
+import bisect
+import gzip
 import json
 import os
+import time
+from collections import deque
 from pathlib import Path
-from typing import List, Dict, Union
-from datetime import datetime
+from typing import AsyncIterator, Callable, Deque, List, Dict, Optional, Tuple, Union
+from datetime import datetime, timezone
+from email.utils import formatdate, parsedate_to_datetime
+import threading
 import traceback
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
+from insight_store import open_insight_store
+from atomic_io import atomic_write_text, exclusive_lock
 
 app = FastAPI(title="Everion Insights API")
 
@@ -23,169 +32,559 @@ app.add_middleware(
 
 # Define file paths with absolute paths
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-TELEGRAM_INSIGHTS_FILE = os.path.join(BASE_DIR, "telegram_insights.json")
-MARKET_INSIGHTS_FILE = os.path.join(BASE_DIR, "market_insights.json")
 SETTINGS_FILE = os.path.join(BASE_DIR, "settings.json")
 
+TELEGRAM_SOURCE = "telegram"
+MARKET_SOURCE = "twitter"
+ALL_INSIGHTS = "all"
+# Per-source endpoints keep the order the old JSON files had: telegram oldest-first, market newest-first.
+NEWEST_FIRST_SOURCES = {MARKET_SOURCE}
+
+# Bodies smaller than this are not worth the gzip framing overhead.
+GZIP_MIN_SIZE = 500
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+def timestamp_sort_key(insight: Dict) -> datetime:
+    """Parse an insight timestamp for sorting; naive values are treated as UTC."""
+    try:
+        ts = datetime.fromisoformat(insight.get("timestamp", "1970-01-01T00:00:00"))
+    except (TypeError, ValueError):
+        return EPOCH
+    return ts if ts.tzinfo else ts.replace(tzinfo=timezone.utc)
+
+def encode_json(content) -> bytes:
+    """Serialize exactly like JSONResponse.render so cached bodies are interchangeable."""
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+class EncodedBody:
+    """A response body serialized once, with an optional gzip variant."""
+
+    def __init__(self, raw: bytes):
+        self.raw = raw
+        self.gzip = gzip.compress(raw) if len(raw) >= GZIP_MIN_SIZE else None
+
+INDEXED_FIELDS = ("contract", "tweet_id")
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+def feed_position(insight: Dict, seq: int) -> Tuple[int, int]:
+    """Sort position in the newest-first feed, also used as the pagination cursor."""
+    ts = timestamp_sort_key(insight)
+    return (-int(ts.timestamp() * 1_000_000), -seq)
+
+def encode_cursor(position: Tuple[int, int]) -> str:
+    return f"{-position[0]}_{-position[1]}"
+
+def decode_cursor(cursor: str) -> Tuple[int, int]:
+    try:
+        ts, seq = cursor.split("_")
+        return (-int(ts), -int(seq))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def record_key(source: str, row_id: int) -> str:
+    return f"{source}:{row_id}"
+
+def keyed(insight: Dict, source: str, row_id: int, seq: int) -> Dict:
+    """Copy of an insight with its record key, which a later tombstone names, and its seq."""
+    return dict(insight, key=record_key(source, row_id), seq=seq)
+
+def keyed_row(row: Dict) -> Dict:
+    return keyed(row["insight"], row["source"], row["id"], row["seq"])
+
+def tombstone(row: Dict) -> Dict:
+    return {
+        "key": record_key(row["source"], row["id"]),
+        "contract": row["contract"],
+        "tweet_id": row["tweet_id"],
+        "seq": row["seq"],
+    }
+
+class InsightCache:
+    """Process-wide in-memory view of the insight store.
+
+    Requests are served from memory; the file watcher calls sync() when a
+    scanner commits to the database, and only rows changed since the last
+    applied sequence number are read. Encoded response bodies are built
+    lazily and dropped on every change. Each source also keeps an
+    identifier index for single-record lookups.
+    """
+
+    def __init__(self, store):
+        self._lock = threading.Lock()
+        self._store = store
+        self._seq = 0
+        self._records: Dict[str, Dict[int, Tuple[int, Dict]]] = {
+            TELEGRAM_SOURCE: {},
+            MARKET_SOURCE: {},
+        }
+        self._index: Dict[str, Dict[str, List[int]]] = {}
+        self._versions: Dict[str, Tuple[int, float]] = {}
+        self._bodies: Dict[str, EncodedBody] = {}
+        self._feed: Optional[Tuple[List[Tuple[int, int]], List[Dict], List[Tuple[str, int, int]]]] = None
+        self._listeners: List[Callable[[], None]] = []
+
+    def add_listener(self, listener: Callable[[], None]) -> None:
+        """Register a callback run after every change; it must not block or re-enter the cache."""
+        with self._lock:
+            self._listeners.append(listener)
+
+    def _apply_locked(self, row: Dict) -> None:
+        records = self._records.setdefault(row["source"], {})
+        index = self._index.setdefault(row["source"], {})
+        if records.pop(row["id"], None) is not None:
+            for field in INDEXED_FIELDS:
+                ids = index.get(row[field])
+                if ids and row["id"] in ids:
+                    ids.remove(row["id"])
+                    if not ids:
+                        del index[row[field]]
+        if not row["deleted"]:
+            records[row["id"]] = (row["seq"], row["insight"])
+            for field in INDEXED_FIELDS:
+                if row[field] is not None:
+                    index.setdefault(row[field], []).append(row["id"])
+
+    def sync(self) -> None:
+        """Apply every store change made after the last one seen."""
+        with self._lock:
+            rows = self._store.changes_since(self._seq)
+            compacted_seq = self._store.compacted_seq()
+            # Tombstones not yet applied here may have been pruned; rebuild from scratch.
+            rebuild = compacted_seq > self._seq
+            if rebuild:
+                rows = self._store.changes_since(0)
+                for records in self._records.values():
+                    records.clear()
+                self._index.clear()
+            elif not rows:
+                return
+            for row in rows:
+                self._apply_locked(row)
+            self._seq = max(compacted_seq, rows[-1]["seq"]) if rows else compacted_seq
+            now = time.time()
+            changed = set(self._records) if rebuild else {row["source"] for row in rows}
+            for name in changed | {ALL_INSIGHTS}:
+                self._versions[name] = (self._seq, now)
+            self._bodies.clear()
+            self._feed = None
+            for listener in self._listeners:
+                listener()
+        print(f"Applied {len(rows)} insight changes up to seq {self._seq}")
+
+    def _source_locked(self, source: str) -> List[Dict]:
+        insights = [insight for _, insight in self._records.get(source, {}).values()]
+        if source in NEWEST_FIRST_SOURCES:
+            insights.reverse()
+        return insights
+
+    def _feed_locked(self) -> Tuple[List[Tuple[int, int]], List[Dict], List[Tuple[str, int, int]]]:
+        """Return all records newest-first, with their positions for bisecting and (source, id, seq) keys."""
+        if self._feed is None:
+            entries = []
+            for source, records in self._records.items():
+                for row_id, (seq, insight) in records.items():
+                    entries.append((feed_position(insight, seq), insight, (source, row_id, seq)))
+            entries.sort(key=lambda entry: entry[0])
+            self._feed = ([e[0] for e in entries], [e[1] for e in entries], [e[2] for e in entries])
+        return self._feed
+
+    def find(self, identifier: str) -> Optional[Dict]:
+        """Return the newest insight whose contract or tweet_id matches, telegram before market."""
+        with self._lock:
+            for source in (TELEGRAM_SOURCE, MARKET_SOURCE):
+                ids = self._index.get(source, {}).get(identifier)
+                if ids:
+                    return self._records[source][ids[-1]][1]
+        return None
+
+    def version(self, name: str) -> Tuple[int, float]:
+        """Return (sequence number, unix time) of the last change to a source or to ALL_INSIGHTS."""
+        with self._lock:
+            return self._versions.get(name, (0, 0.0))
+
+    def body(self, name: str) -> EncodedBody:
+        """Return the encoded body for one source, or the merged feed for ALL_INSIGHTS."""
+        with self._lock:
+            if name not in self._bodies:
+                if name == ALL_INSIGHTS:
+                    content = self._feed_locked()[1]
+                else:
+                    content = self._source_locked(name)
+                self._bodies[name] = EncodedBody(encode_json(content))
+            return self._bodies[name]
+
+    def page(self, cursor: Optional[str], limit: int) -> Dict:
+        """Return one page of the newest-first feed, starting after cursor."""
+        with self._lock:
+            positions, insights, keys = self._feed_locked()
+            start = bisect.bisect_right(positions, decode_cursor(cursor)) if cursor else 0
+            end = min(start + limit, len(insights))
+            return {
+                "items": [keyed(insights[i], *keys[i]) for i in range(start, end)],
+                "next_cursor": encode_cursor(positions[end - 1]) if end < len(insights) else None,
+                "seq": self._seq,
+            }
+
+    def changes_since(self, since: int, limit: int) -> Dict:
+        """Return records added and tombstones for records deleted after sequence number since.
+
+        Read straight from the store's sequence index. A since value beyond
+        the store's last sequence number comes from a different database, and
+        one below the last compaction may have missed dropped tombstones; the
+        client then gets reset=True and the whole live set in one response,
+        and should replace its state. The seq of a reset is never below the
+        last compaction, so the next request resumes normally.
+
+        Each item carries the key and seq of its record; a tombstone names
+        the key of the record it removes.
+        """
+        last_seq = self._store.last_seq()
+        if since > last_seq or since < self._store.compacted_seq():
+            rows = self._store.changes_since(0)
+            return {
+                "items": [keyed_row(row) for row in rows if not row["deleted"]],
+                "tombstones": [],
+                "seq": max(last_seq, rows[-1]["seq"]) if rows else last_seq,
+                "has_more": False,
+                "reset": True,
+            }
+        rows = self._store.changes_since(since, limit + 1)
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        return {
+            "items": [keyed_row(row) for row in rows if not row["deleted"]],
+            "tombstones": [tombstone(row) for row in rows if row["deleted"]],
+            "seq": rows[-1]["seq"] if rows else since,
+            "has_more": has_more,
+            "reset": False,
+        }
+
+insight_store = open_insight_store()
+insight_cache = InsightCache(insight_store)
+
+# Frames kept for subscribers that are briefly behind; older ones get a catch-up from the cache.
+STREAM_BACKLOG = 256
+STREAM_KEEPALIVE_SECONDS = 15
+
+def collect_changes(since: int) -> Dict:
+    """Gather every change after since into a single changes_since() shaped dict."""
+    content = insight_cache.changes_since(since, MAX_PAGE_SIZE)
+    while content["has_more"]:
+        more = insight_cache.changes_since(content["seq"], MAX_PAGE_SIZE)
+        if more["reset"]:
+            # Compacted while paging; a reset already holds the whole live set.
+            return more
+        if more["seq"] <= content["seq"]:
+            break
+        content["items"].extend(more["items"])
+        content["tombstones"].extend(more["tombstones"])
+        content["seq"] = more["seq"]
+        content["has_more"] = more["has_more"]
+    return content
+
+def encode_sse(seq: int, content: Dict) -> bytes:
+    return b"id: %d\nevent: insights\ndata: %s\n\n" % (seq, encode_json(content))
+
+class InsightBroadcaster:
+    """Fan out insight changes to /insights/stream subscribers.
+
+    Each change is read from the cache and encoded as an SSE frame exactly
+    once. Subscribers all wait on one shared future and copy frames from a
+    short backlog, so publishing costs the same however many are connected.
+    """
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._seq = 0
+        self._frames: Deque[Tuple[int, int, bytes]] = deque(maxlen=STREAM_BACKLOG)
+        self._changed: Optional[asyncio.Future] = None
+
+    def start(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._loop = loop
+        self._seq = insight_cache.version(ALL_INSIGHTS)[0]
+        self._changed = loop.create_future()
+
+    def notify(self) -> None:
+        """Schedule a publish; safe to call from the file watcher thread."""
+        if self._loop is None:
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._publish)
+        except RuntimeError:
+            # Event loop already closed during shutdown.
+            pass
+
+    def _publish(self) -> None:
+        content = collect_changes(self._seq)
+        if content["seq"] <= self._seq:
+            return
+        self._frames.append((self._seq, content["seq"], encode_sse(content["seq"], content)))
+        self._seq = content["seq"]
+        self._changed.set_result(None)
+        self._changed = self._loop.create_future()
+
+    def _frames_after(self, last: int) -> Tuple[List[bytes], int]:
+        if last == self._seq:
+            return [], last
+        if last > self._seq or not self._frames or last < self._frames[0][0]:
+            # Not covered by the backlog: catch up from the cache, which resets
+            # a since from another database or from before a compaction.
+            content = collect_changes(last)
+            if not content["reset"] and content["seq"] <= last:
+                return [], last
+            return [encode_sse(content["seq"], content)], content["seq"]
+        return [frame for _, to_seq, frame in self._frames if to_seq > last], self._seq
+
+    async def subscribe(self, since: Optional[int]) -> AsyncIterator[bytes]:
+        """Yield SSE frames for every change after since (or from now), with periodic keep-alives."""
+        last = self._seq if since is None else since
+        while True:
+            changed = self._changed
+            frames, last = self._frames_after(last)
+            for frame in frames:
+                yield frame
+            try:
+                await asyncio.wait_for(asyncio.shield(changed), STREAM_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield b": keep-alive\n\n"
+
+broadcaster = InsightBroadcaster()
+insight_cache.add_listener(broadcaster.notify)
+
 class InsightFileHandler(FileSystemEventHandler):
+    def _refresh(self, path: str) -> None:
+        # SQLite in WAL mode writes to the -wal file; any change to the store's files triggers a sync.
+        if os.path.basename(path).startswith(os.path.basename(insight_store.path)):
+            insight_cache.sync()
+
     def on_modified(self, event):
-        if not event.is_directory and event.src_path.endswith(('market_insights.json', 'telegram_insights.json')):
-            print(f"\nFile change detected: {event.src_path}")
+        if not event.is_directory:
+            self._refresh(event.src_path)
+
+    def on_created(self, event):
+        if not event.is_directory:
+            self._refresh(event.src_path)
+
+    def on_moved(self, event):
+        if not event.is_directory:
+            self._refresh(event.dest_path)
+
+SETTINGS_LOCK_FILE = SETTINGS_FILE + ".lock"
+
+def save_settings(data) -> None:
+    """Replace settings.json atomically while holding the settings lock."""
+    with exclusive_lock(SETTINGS_LOCK_FILE):
+        atomic_write_text(SETTINGS_FILE, json.dumps(data, indent=4, ensure_ascii=False))
 
 def ensure_files_exist():
-    """Ensure insight files exist and are properly initialized."""
-    for file_path in [TELEGRAM_INSIGHTS_FILE, MARKET_INSIGHTS_FILE, SETTINGS_FILE]:
+    """Ensure the settings file exists and contains a JSON object."""
+    try:
+        if not os.path.exists(SETTINGS_FILE):
+            save_settings({})
+            print(f"Created new file: {SETTINGS_FILE}")
+        else:
+            # Verify file is readable and valid JSON
+            with open(SETTINGS_FILE, 'r', encoding='utf-8') as f:
+                try:
+                    data = json.load(f)
+                except json.JSONDecodeError:
+                    data = None
+            if not isinstance(data, dict):
+                print(f"Warning: {SETTINGS_FILE} contains invalid data, resetting...")
+                save_settings({})
+    except Exception as e:
+        print(f"Error ensuring file {SETTINGS_FILE}: {e}")
+        traceback.print_exc()
+
+observer = None
+compactor_task = None
+
+# How often the server checks whether the insight store needs compacting.
+COMPACT_INTERVAL_SECONDS = 600
+
+async def compact_insight_store_periodically():
+    """Let the store drop deleted records and tombstones once enough of it is dead."""
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(COMPACT_INTERVAL_SECONDS)
         try:
-            if not os.path.exists(file_path):
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    json.dump([], f, indent=4)
-                print(f"Created new file: {file_path}")
-            else:
-                # Verify file is readable and valid JSON
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    try:
-                        data = json.load(f)
-                        # For settings.json, if not a dict, reset to an empty dict.
-                        if file_path == SETTINGS_FILE and not isinstance(data, dict):
-                            print(f"Warning: {file_path} contains invalid data, resetting...")
-                            with open(file_path, 'w', encoding='utf-8') as f:
-                                json.dump({}, f, indent=4)
-                    except json.JSONDecodeError:
-                        print(f"Warning: {file_path} contains invalid JSON, resetting...")
-                        with open(file_path, 'w', encoding='utf-8') as f:
-                            json.dump([] if file_path != SETTINGS_FILE else {}, f, indent=4)
+            await loop.run_in_executor(None, insight_store.compact)
         except Exception as e:
-            print(f"Error ensuring file {file_path}: {e}")
+            print(f"Error compacting insight store: {e}")
             traceback.print_exc()
 
-def load_insights(file_path: str) -> List[Dict]:
-    """Helper to load insights from a given JSON file with better error handling."""
-    try:
-        if os.path.exists(file_path):
-            with open(file_path, "r", encoding='utf-8') as f:
-                data = json.load(f)
-                return data if isinstance(data, list) else []
-    except Exception as e:
-        print(f"Error loading insights from {file_path}: {e}")
-        traceback.print_exc()
-    return []
+@app.on_event("startup")
+async def start_insight_watcher():
+    """Prime the insight cache and watch the insight store for scanner writes."""
+    global observer, compactor_task
+    insight_cache.sync()
+    broadcaster.start(asyncio.get_running_loop())
+    observer = Observer()
+    observer.schedule(InsightFileHandler(), path=os.path.dirname(insight_store.path), recursive=False)
+    observer.start()
+    compactor_task = asyncio.create_task(compact_insight_store_periodically())
 
-def save_insights(file_path: str, insights: List[Dict]) -> None:
-    """Helper to save insights to a given JSON file with proper encoding."""
-    try:
-        with open(file_path, "w", encoding='utf-8') as f:
-            json.dump(insights, f, indent=4, ensure_ascii=False)
-    except Exception as e:
-        print(f"Error saving insights to {file_path}: {e}")
-        traceback.print_exc()
+@app.on_event("shutdown")
+async def stop_insight_watcher():
+    if compactor_task is not None:
+        compactor_task.cancel()
+    if observer is not None:
+        observer.stop()
+        observer.join()
 
 @app.get("/")
 async def read_root() -> Dict[str, Union[str, List[str]]]:
     """Root endpoint to check if the server is running."""
     return {
         "message": "Everion Insights API is running!",
-        "available_endpoints": ["/insights", "/insights/telegram", "/insights/market", "/insights/{identifier}", "/settings"],
+        "available_endpoints": ["/insights", "/insights/telegram", "/insights/market", "/insights/{identifier}", "/insights/stream", "/settings"],
         "status": "active"
     }
 
-@app.get("/insights")
-async def get_all_insights():
-    """Fetch all insights (both Telegram and Market) combined."""
-    telegram_insights = load_insights(TELEGRAM_INSIGHTS_FILE)
-    market_insights = load_insights(MARKET_INSIGHTS_FILE)
-    all_insights = telegram_insights + market_insights
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
 
+def modified_since(if_modified_since: str, last_modified: float) -> bool:
     try:
-        all_insights.sort(
-            key=lambda x: datetime.fromisoformat(x.get("timestamp", "1970-01-01T00:00:00")),
-            reverse=True,
-        )
-    except Exception as e:
-        print(f"Sorting error: {e}")
-        traceback.print_exc()
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return True
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return int(last_modified) > since.timestamp()
 
-    return JSONResponse(
-        content=all_insights,
-        headers={
-            "Access-Control-Allow-Origin": "http://localhost:3000",
-            "Access-Control-Allow-Credentials": "true",
-        },
-    )
+def conditional_headers(request: Request, name: str, variant: str = "") -> Tuple[Dict[str, str], bool]:
+    """Build validator headers for an insight view and report whether the client copy is current.
+
+    The ETag is the cache sequence number of the last change, suffixed per
+    content encoding. If-None-Match takes precedence over If-Modified-Since.
+    """
+    seq, last_modified = insight_cache.version(name)
+    headers = {
+        "Access-Control-Allow-Origin": "http://localhost:3000",
+        "Access-Control-Allow-Credentials": "true",
+        "Cache-Control": "no-cache",
+        "ETag": f'"{seq}{variant}"',
+        "Last-Modified": formatdate(last_modified, usegmt=True),
+    }
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return headers, etag_matches(if_none_match, headers["ETag"])
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is not None:
+        return headers, not modified_since(if_modified_since, last_modified)
+    return headers, False
+
+def cached_body_response(request: Request, name: str) -> Response:
+    """Serve a pre-encoded insight list, gzipped when the client accepts it."""
+    accepts_gzip = "gzip" in request.headers.get("accept-encoding", "").lower()
+    headers, fresh = conditional_headers(request, name, "-gzip" if accepts_gzip else "")
+    headers["Vary"] = "Accept-Encoding"
+    if fresh:
+        return Response(status_code=304, headers=headers)
+
+    body = insight_cache.body(name)
+    if accepts_gzip and body.gzip is not None:
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=body.gzip, media_type="application/json", headers=headers)
+    return Response(content=body.raw, media_type="application/json", headers=headers)
+
+@app.get("/insights")
+async def get_all_insights(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    since: Optional[int] = None,
+):
+    """Fetch all insights (both Telegram and Market) combined, newest first.
+
+    Without parameters the full array is returned. With limit/cursor the
+    feed is paged; with since only records changed after that sequence
+    number are returned, plus tombstones for deleted ones. Paged and since
+    items carry a key that a tombstone for the same record repeats.
+    """
+    if limit is None and cursor is None and since is None:
+        return cached_body_response(request, ALL_INSIGHTS)
+
+    headers, fresh = conditional_headers(request, ALL_INSIGHTS)
+    if fresh:
+        return Response(status_code=304, headers=headers)
+
+    limit = limit or DEFAULT_PAGE_SIZE
+    if since is not None:
+        content = insight_cache.changes_since(since, limit)
+    else:
+        content = insight_cache.page(cursor, limit)
+    return JSONResponse(content=content, headers=headers)
 
 @app.get("/insights/telegram")
-async def get_telegram_insights():
+async def get_telegram_insights(request: Request):
     """Fetch all Telegram insights."""
-    insights = load_insights(TELEGRAM_INSIGHTS_FILE)
-    return JSONResponse(
-        content=insights,
-        headers={
-            "Access-Control-Allow-Origin": "http://localhost:3000",
-            "Access-Control-Allow-Credentials": "true",
-        },
-    )
+    return cached_body_response(request, TELEGRAM_SOURCE)
 
 @app.get("/insights/market")
-async def get_market_insights():
+async def get_market_insights(request: Request):
     """Fetch all Market (X) insights."""
-    insights = load_insights(MARKET_INSIGHTS_FILE)
-    return JSONResponse(
-        content=insights,
+    return cached_body_response(request, MARKET_SOURCE)
+
+@app.get("/insights/stream")
+async def stream_insights(request: Request, since: Optional[int] = None):
+    """Push new and deleted insights as Server-Sent Events.
+
+    Each event carries the same payload as /insights?since=..., with the
+    sequence number as the event id so reconnecting clients resume via
+    Last-Event-ID.
+    """
+    if since is None:
+        last_event_id = request.headers.get("last-event-id")
+        if last_event_id and last_event_id.isdigit():
+            since = int(last_event_id)
+    return StreamingResponse(
+        broadcaster.subscribe(since),
+        media_type="text/event-stream",
         headers={
             "Access-Control-Allow-Origin": "http://localhost:3000",
             "Access-Control-Allow-Credentials": "true",
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
         },
     )
 
 @app.delete("/insights/{identifier}")
 async def delete_insight(identifier: str):
-    """Delete a specific insight by identifier."""
-    telegram_insights = load_insights(TELEGRAM_INSIGHTS_FILE)
-    market_insights = load_insights(MARKET_INSIGHTS_FILE)
-
-    # Update telegram insights - look for contract match
-    updated_telegram = [i for i in telegram_insights if i.get("contract") != identifier]
-    if len(updated_telegram) != len(telegram_insights):
-        save_insights(TELEGRAM_INSIGHTS_FILE, updated_telegram)
-        print(f"Deleted from telegram_insights.json: {identifier}")
-
-    # Update market insights - look for both tweet_id and contract
-    updated_market = [
-        i for i in market_insights 
-        if not (
-            (i.get("tweet_id") == identifier) or 
-            (i.get("contract") == identifier)
-        )
-    ]
-    if len(updated_market) != len(market_insights):
-        save_insights(MARKET_INSIGHTS_FILE, updated_market)
-        print(f"Deleted from market_insights.json: {identifier}")
-
-    if len(updated_telegram) == len(telegram_insights) and len(updated_market) == len(market_insights):
+    """Delete every insight whose contract or tweet_id matches the identifier."""
+    deleted = insight_store.delete(identifier)
+    if not deleted:
         print(f"No insight found with identifier: {identifier}")
         return JSONResponse(
             content={"message": "No insight found with the given identifier"},
             status_code=404
         )
 
+    insight_cache.sync()
+    print(f"Deleted {deleted} insight(s) with identifier: {identifier}")
     return {"message": f"Insight with identifier {identifier} deleted successfully"}
 
 @app.get("/insights/{identifier}")
-async def get_insight_by_identifier(identifier: str):
+async def get_insight_by_identifier(request: Request, identifier: str):
     """Fetch an insight by identifier with improved error handling."""
-    telegram_insights = load_insights(TELEGRAM_INSIGHTS_FILE)
-    market_insights = load_insights(MARKET_INSIGHTS_FILE)
-    all_insights = telegram_insights + market_insights
-
-    for insight in all_insights:
-        if insight.get("contract") == identifier or insight.get("tweet_id") == identifier:
-            return JSONResponse(
-                content=insight,
-                headers={
-                    "Access-Control-Allow-Origin": "http://localhost:3000",
-                    "Access-Control-Allow-Credentials": "true",
-                },
-            )
-    
+    headers, fresh = conditional_headers(request, ALL_INSIGHTS)
+    if fresh:
+        return Response(status_code=304, headers=headers)
+
+    insight = insight_cache.find(identifier)
+    if insight is not None:
+        return JSONResponse(content=insight, headers=headers)
+
     return JSONResponse(
         content={"message": "Insight not found"},
         status_code=404,
@@ -197,8 +596,7 @@ async def update_settings(request: Request):
     try:
         data = await request.json()
         # Save the settings data into settings.json
-        with open(SETTINGS_FILE, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=4, ensure_ascii=False)
+        save_settings(data)
         return {"message": "Settings updated successfully."}
     except Exception as e:
         print(f"Error updating settings: {e}")
@@ -222,20 +620,11 @@ if __name__ == "__main__":
     # Ensure insight and settings files exist and are valid
     ensure_files_exist()
 
-    # Set up file watcher for insights (optional)
-    event_handler = InsightFileHandler()
-    observer = Observer()
-    observer.schedule(event_handler, path=BASE_DIR, recursive=False)
-    observer.start()
-
-    try:
-        # IMPORTANT: Bind to 0.0.0.0 on port 3000 for Fly.io routing
-        uvicorn.run(
-            app,
-            host="0.0.0.0",
-            port=3000,
-            log_level="info"
-        )
-    finally:
-        observer.stop()
-        observer.join()
+    # The insight file watcher is started by the app's startup hook.
+    # IMPORTANT: Bind to 0.0.0.0 on port 3000 for Fly.io routing
+    uvicorn.run(
+        app,
+        host="0.0.0.0",
+        port=3000,
+        log_level="info"
+    )
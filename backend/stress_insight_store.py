@@ -0,0 +1,106 @@
+"""Stress the insight stores with several writer processes at once.
+
+Usage:
+    python stress_insight_store.py [--store sqlite|jsonl|both] [--processes N] [--adds N]
+
+Each process adds its own insights and deletes every third one again,
+and the first process also compacts the store as it goes.
+Afterwards the surviving tweet_ids must be exactly the undeleted ones and
+every sequence number must be unique. Runs in a temporary directory and
+exits non-zero on failure.
+"""
+import argparse
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+
+import insight_store
+
+DELETE_EVERY = 3
+COMPACT_EVERY = 40
+
+def open_store(store: str, path: str):
+    # Keep the legacy JSON files next to the real store out of the test.
+    insight_store.LEGACY_TELEGRAM_FILE = os.path.join(os.path.dirname(path), "missing.json")
+    insight_store.LEGACY_MARKET_FILE = insight_store.LEGACY_TELEGRAM_FILE
+    # Compact often enough for the writers to race with it.
+    insight_store.COMPACT_MIN_LINES = 50
+    if store == "sqlite":
+        return insight_store.SQLiteInsightStore(path)
+    return insight_store.JsonlInsightStore(path)
+
+def writer(store: str, path: str, worker: int, adds: int):
+    s = open_store(store, path)
+    for i in range(adds):
+        s.add({"contract": f"c{worker}-{i}", "tweet_id": f"t{worker}-{i}", "source": "twitter"})
+        if i % DELETE_EVERY == 0:
+            s.delete(f"c{worker}-{i}")
+        if worker == 0 and i % COMPACT_EVERY == 0:
+            s.compact()
+
+def run(store: str, processes: int, adds: int) -> bool:
+    directory = tempfile.mkdtemp(prefix="insight-stress-")
+    try:
+        return check(store, os.path.join(directory, "insights.db" if store == "sqlite" else "insights.jsonl"), processes, adds)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+def check(store: str, path: str, processes: int, adds: int) -> bool:
+    open_store(store, path)
+    workers = [
+        multiprocessing.Process(target=writer, args=(store, path, n, adds))
+        for n in range(processes)
+    ]
+    for p in workers:
+        p.start()
+    for p in workers:
+        p.join()
+
+    errors = [f"writer {n} exited with {p.exitcode}" for n, p in enumerate(workers) if p.exitcode]
+    s = open_store(store, path)
+    expected = {
+        f"t{n}-{i}" for n in range(processes) for i in range(adds) if i % DELETE_EVERY != 0
+    }
+    live = s.live_tweet_ids()
+    if len(live) != len(set(live)):
+        errors.append(f"live_tweet_ids has {len(live) - len(set(live))} duplicate(s)")
+    if set(live) != expected:
+        errors.append(
+            f"live tweet_ids differ: {len(expected - set(live))} missing, {len(set(live) - expected)} unexpected"
+        )
+    rows = s.changes_since(0)
+    live_rows = {r["insight"]["tweet_id"] for r in rows if not r["deleted"]}
+    if live_rows != expected:
+        errors.append("changes_since(0) disagrees with the expected live rows")
+    seqs = [r["seq"] for r in rows]
+    if len(seqs) != len(set(seqs)):
+        errors.append(f"{len(seqs) - len(set(seqs))} duplicate seq(s)")
+    if seqs != sorted(seqs):
+        errors.append("changes_since(0) is not in seq order")
+    if seqs and max(seqs) > s.last_seq():
+        errors.append(f"seq {max(seqs)} is past last_seq {s.last_seq()}")
+
+    print(
+        f"{store}: {processes} process(es) x {adds} adds, {len(live)} live, "
+        f"last_seq {s.last_seq()}, compacted_seq {s.compacted_seq()}"
+    )
+    for error in errors:
+        print(f"  ❌ {error}")
+    print(f"{store}: {'FAIL' if errors else 'PASS'}")
+    return not errors
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-process insight store stress test")
+    parser.add_argument("--store", choices=("sqlite", "jsonl", "both"), default="both")
+    parser.add_argument("--processes", type=int, default=4, help="concurrent writer processes")
+    parser.add_argument("--adds", type=int, default=300, help="insights added by each process")
+    args = parser.parse_args()
+
+    stores = ("sqlite", "jsonl") if args.store == "both" else (args.store,)
+    results = [run(store, args.processes, args.adds) for store in stores]
+    sys.exit(0 if all(results) else 1)
+
+if __name__ == "__main__":
+    main()